@@ -4,113 +4,61 @@
 import optparse
 import sys
 
+from corpus import SUPERPERMUTATION, is_superpermutation
+from cycles import cycle_table, find_cycles
+from permscan import infer_n
+
 SYMBOLS = "123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
 
 parser = optparse.OptionParser(usage="%prog [options] N")
 parser.add_option("-g", "--graph", action="store_true", help="output the results in graphviz format")
 parser.add_option("", "--oneline", action="store_true", help="output the results in one-line format")
+parser.add_option("-s", "--summary", action="store_true",
+	help="summarise the 2-cycle and 3-cycle graphs of each superpermutation, one per line")
 
 (options, args) = parser.parse_args()
-if options.graph and options.oneline:
-	parser.error("You can’t specify both --graph and --oneline")
+if len(filter(None, [options.graph, options.oneline, options.summary])) > 1:
+	parser.error("You can specify only one of --graph, --oneline and --summary")
 if len(args) != 1: parser.error("Wrong number of arguments")
 
 n = int(args[0])
-header = ""
-if len(args) == 1:
-	s = sys.stdin.read().strip()
-elif len(args) == 2:
-	filename = args[1]
-	header = "\n=>" + filename
-	s = open(filename).read().strip()
-else:
-	parser.error("Wrong number of arguments")
-
-sorted_perm = list(SYMBOLS[:n])
-
-def cyclerep(c):
-	"""
-	The canonical representative of the cyclic equivalence class of c
-	"""
-	m = min(c)
-	i = c.index(m)
-	return c[i:] + c[:i]
-
-def two_cycle(p):
-	"""
-	The 2-cycle determined by the permutation p
-	"""
-	return (p[-1], cyclerep(p[:-1]))
-
-def three_cycle(p):
-	"""
-	The 3-cycle determined by the permutation p
-	"""
-	return (p[-1], p[-2], cyclerep(p[:-2]))
-
-def neighbours(c, p):
-	for i in range(len(p)):
-		d = p[:i] + p[i+1:]
-		for j in range(len(p) - 1):
-			yield (p[i], cyclerep(d[:j] + c + d[j:]), i == j)
-
-
-two_cycles = {}
-three_cycles = {}
-gap = 1
-current_two_cycle = None
-for i in range(len(s) - n):
-	p = s[i : i+n]
-	if sorted(p) == sorted_perm:
-		if gap > 0:
-			# Entering a different 1-cycle
-			ts = two_cycle(p)
-			if ts != current_two_cycle:
-				# Entering a different 2-cycle
-				thrs = three_cycle(p)
-				three_cycles.setdefault(thrs, []).append(ts)
-			current_two_cycle = ts
-			two_cycles.setdefault(ts, []).append(p)
-		gap = 0
-	else:
-		gap += 1
+table = cycle_table(n)
 
 def two_cycles_adjacencies(two_cycles):
-	max_nb = 0
-	n_nbs = {}
-	tss = set(two_cycles.iterkeys())
-	r = ""
-	for (c, p) in sorted(tss):
+	graph = table.two_cycle_graph
+	tss = set([ table.two_cycle_index[ts] for ts in two_cycles ])
+	lines = []
+	for i in sorted(tss):
+		(c, p) = table.two_cycles[i]
 		nbs = [
-			c_ + " " + p_ + ("*" if d_ else "") for (c_, p_, d_) in neighbours(c, p)
-			if (c_, p_) in tss
+			"%s %s%s" % (table.two_cycles[j] + ("*" if d_ else "",))
+			for (j, d_) in graph.neighbours(i)
+			if j in tss
 		]
-		max_nb = max(max_nb, len(nbs))
-		n_nbs[len(nbs)] = n_nbs.get(len(nbs), 0) + 1
-		r += c + " " + p + "   " + ", ".join(nbs) + "\n"
-	return r
+		lines.append(c + " " + p + "   " + ", ".join(nbs) + "\n")
+	return "".join(lines)
 
 def two_cycles_graphviz(two_cycles):
+	graph = table.two_cycle_graph
 	ts_list = list(two_cycles.iterkeys())
-	tss = set(ts_list)
 
 	index_by_two_cycle = {}
-	for (i, ts) in enumerate(ts_list): index_by_two_cycle[ts] = i
+	for (i, ts) in enumerate(ts_list): index_by_two_cycle[table.two_cycle_index[ts]] = i
 
-	r = "graph {\n"
+	lines = ["graph {"]
 	for (i, (c, p)) in enumerate(ts_list):
-		r += "  \"%s/%s\";\n" % (c, p)
-		for (c_, p_, d_) in neighbours(c, p):
-			if (c_, p_) not in tss: continue
-			if index_by_two_cycle[(c_, p_)] < i: continue
-			edge = "\"%s/%s\" -- \"%s/%s\"" % (c, p, c_, p_)
+		lines.append("  \"%s/%s\";" % (c, p))
+		for (j, d_) in graph.neighbours(table.two_cycle_index[(c, p)]):
+			if j not in index_by_two_cycle: continue
+			if index_by_two_cycle[j] < i: continue
+			edge = "\"%s/%s\" -- \"%s/%s\"" % ((c, p) + table.two_cycles[j])
 			if d_:
-				r += "  { edge[style=bold]; %s; }\n" % (edge,);
+				lines.append("  { edge[style=bold]; %s; }" % (edge,))
 			else:
-				r += "  %s;\n" % (edge,);
+				lines.append("  %s;" % (edge,))
 
-	r += "}\n"
-	return r
+	lines.append("}\n")
+	return "\n".join(lines)
 
 def two_cycles_oneline(two_cycles):
 	return " ".join([
@@ -118,10 +66,31 @@ def two_cycles_oneline(two_cycles):
 		for ts in sorted(two_cycles.iterkeys())
 	])
 
+def graph_summary(graph):
+	return "%d vertices, %d edges, %d components, cycle rank %d%s; degrees %s; hash %s" % (
+		len(graph), graph.edge_count(), len(graph.components()), graph.cycle_rank(),
+		" (tree)" if graph.is_tree() else "",
+		" ".join([ "%d:%d" % dc for dc in graph.degree_histogram() ]),
+		graph.invariant_hash(),
+	)
+
+if options.summary:
+	# Skip comments, and any lines that are not superpermutations on n symbols
+	for line in sys.stdin:
+		s = line.split("#")[0].strip()
+		if not (SUPERPERMUTATION.match(s) and is_superpermutation(s) and infer_n(s) == n): continue
+		(two_cycle_graph, three_cycle_graph) = table.graphs(*find_cycles(s, n))
+		print "%d\t2-cycles: %s\t3-cycles: %s" % (
+			len(s), graph_summary(two_cycle_graph), graph_summary(three_cycle_graph))
+	sys.exit()
+
+s = sys.stdin.read().strip()
+two_cycles, three_cycles = find_cycles(s, n)
+
 if options.oneline:
 	print two_cycles_oneline(two_cycles)
 elif options.graph:
 	print two_cycles_graphviz(two_cycles)
 else:
-	print header
+	print
 	print two_cycles_adjacencies(two_cycles)
@@ -0,0 +1,39 @@
+#!/usr/bin/python
+# -*- encoding: utf-8 -*-
+"""
+Convert an ATSP instance between TSPLIB text format and the compact
+binary format described in tsplib.py. The direction of the conversion
+is determined by the format of the input file.
+"""
+
+from __future__ import division
+
+import optparse
+
+import tsplib
+
+parser = optparse.OptionParser(usage="%prog [options] INPUT OUTPUT")
+parser.add_option("-t", "--text", action="store_true", help="always write TSPLIB text format")
+parser.add_option("-b", "--binary", action="store_true", help="always write binary format")
+
+(options, args) = parser.parse_args()
+if options.text and options.binary:
+    parser.error("You can't specify both --text and --binary")
+if len(args) != 2: parser.error("Wrong number of arguments")
+(input_filename, output_filename) = args
+
+atsp = tsplib.ATSP(input_filename)
+if options.text:
+    binary = False
+elif options.binary:
+    binary = True
+else:
+    binary = not atsp.is_binary
+
+if binary:
+    with open(output_filename, 'wb') as out:
+        tsplib.write_binary(atsp, out)
+else:
+    with open(output_filename, 'w') as out:
+        tsplib.write_text(atsp, out)
+atsp.close()
@@ -0,0 +1,181 @@
+#!/usr/bin/python
+# -*- encoding: utf-8 -*-
+"""
+Analyse every superpermutation in a set of files, such as the
+superpermutations/ directory, and write a summary with one record each.
+
+Directories are searched recursively. Files ending in .gz are gunzipped,
+and each file in a .zip archive is read in turn, as they are read, so
+nothing needs to be unpacked to disk first. In each file, every line that
+consists only of symbols, once any comment starting with # is removed, and
+starts with a permutation, is taken to be a superpermutation; other lines,
+such as the lists of 2-cycles kept alongside some of them, are skipped.
+
+The superpermutations are analysed by a pool of worker processes, which
+find for each one, in a single scan:
+
+    n              the number of symbols, inferred from the first permutation
+    length
+    permutations   the number of distinct permutations, as splitsuperperm.py -c
+    complete       whether that is all n! of them
+    spans          the lengths of the runs of permutations, as span-map.py
+    two_cycles     the number of 2-cycles it enters, as 2cycles.py
+    three_cycles   the number of 3-cycles it enters
+
+The summary is written as JSON, one record per line, or as CSV, in which
+the spans are separated by spaces.
+"""
+
+from __future__ import division
+
+import collections
+import csv
+import gzip
+import json
+import multiprocessing
+import optparse
+import os
+import re
+import sys
+import zipfile
+from math import factorial
+
+from cycles import find_cycles
+from permrank import PermutationSet
+from permscan import infer_n, scan
+
+FIELDS = ("file", "line", "n", "length", "permutations", "complete",
+    "spans", "two_cycles", "three_cycles")
+
+SYMBOLS = "123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+SUPERPERMUTATION = re.compile(r"^[1-9A-Z]+$")
+
+# Record the permutations seen in a set of ranks rather than a bitset of n!
+# bits beyond this, in case a line of many symbols looks like a superpermutation
+MAX_BITSET_N = 10
+
+def is_hidden(name):
+    """
+    Whether a file in a directory or archive is one to skip,
+    such as .DS_Store, or anything in the __MACOSX folder of a zip.
+    """
+    return any([ part.startswith(".") or part == "__MACOSX" for part in name.split("/") ])
+
+def files(paths):
+    """
+    Generate the names of the files at the paths, looking in directories recursively.
+    """
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+            continue
+        for (dirpath, dirnames, filenames) in os.walk(path):
+            dirnames.sort()
+            for filename in sorted(filenames):
+                if not is_hidden(filename):
+                    yield os.path.join(dirpath, filename)
+
+def lines(filename):
+    """
+    Generate (name, line number, line) for each line of the file, or of each
+    file in it if it is a zip archive, decompressing them as they are read.
+    """
+    if filename.endswith(".zip"):
+        with zipfile.ZipFile(filename) as z:
+            for info in z.infolist():
+                if info.filename.endswith("/") or is_hidden(info.filename):
+                    continue
+                name = os.path.join(filename, info.filename)
+                with z.open(info) as f:
+                    for (i, line) in enumerate(f):
+                        yield (name, i + 1, line)
+    else:
+        with (gzip.open(filename) if filename.endswith(".gz") else open(filename)) as f:
+            for (i, line) in enumerate(f):
+                yield (filename, i + 1, line)
+
+def is_superpermutation(line):
+    """
+    Whether a line of symbols starts with a permutation of the first n
+    symbols, for some n > 1, as a superpermutation would.
+    """
+    n = infer_n(line)
+    return n > 1 and "".join(sorted(line[:n])) == SYMBOLS[:n]
+
+def superpermutations(paths):
+    """
+    Generate (name, line number, superpermutation) for each superpermutation in the files.
+    """
+    for filename in files(paths):
+        for (name, i, line) in lines(filename):
+            if "#" in line:
+                line = line[:line.index("#")]
+            line = line.strip()
+            if SUPERPERMUTATION.match(line) and is_superpermutation(line):
+                yield (name, i, line)
+
+def analyse((name, i, s)):
+    """
+    The record for the superpermutation s, found on line i of the named file.
+    """
+    n = infer_n(s)
+    flags = bytearray(len(s) - n + 1)
+    permutations = PermutationSet(n) if n <= MAX_BITSET_N else set()
+    for (j, r) in scan(s, n):
+        flags[j] = 1
+        permutations.add(r)
+
+    runs = str(flags).split("\x00")
+    spans = map(len, runs[:-1])
+    if runs[-1]: spans.append(len(runs[-1]))
+
+    # 2cycles.py leaves out the last window
+    (two_cycles, three_cycles) = find_cycles(s, n, flags[:-1])
+
+    return collections.OrderedDict([
+        ("file", name), ("line", i), ("n", n), ("length", len(s)),
+        ("permutations", len(permutations)),
+        ("complete", len(permutations) == factorial(n)),
+        ("spans", spans),
+        ("two_cycles", len(two_cycles)), ("three_cycles", len(three_cycles)),
+    ])
+
+def main():
+    parser = optparse.OptionParser(usage="%prog [options] PATH...")
+    parser.add_option("-f", "--format", choices=("jsonl", "csv"), default="jsonl",
+        help="the format of the summary: jsonl (the default) or csv")
+    parser.add_option("-o", "--output", metavar="FILE",
+        help="write the summary to FILE rather than standard output")
+    parser.add_option("-p", "--processes", type="int", default=None,
+        help="the number of worker processes to use (default: one per CPU)")
+    options, paths = parser.parse_args()
+    if not paths:
+        parser.error("No files given")
+
+    out = sys.stdout if options.output is None else open(options.output, "wb")
+    if options.format == "csv":
+        writer = csv.writer(out)
+        writer.writerow(FIELDS)
+
+    counts = collections.Counter()
+    pool = multiprocessing.Pool(options.processes)
+    try:
+        for record in pool.imap(analyse, superpermutations(paths), chunksize=64):
+            counts[record["complete"]] += 1
+            if options.format == "csv":
+                writer.writerow([
+                    " ".join(map(str, record[k])) if k == "spans" else record[k]
+                    for k in FIELDS
+                ])
+            else:
+                out.write(json.dumps(record) + "\n")
+    finally:
+        pool.terminate()
+    if options.output is not None:
+        out.close()
+
+    print >>sys.stderr, "%d superpermutations, %d incomplete" % (
+        counts[True] + counts[False], counts[False])
+
+if __name__ == "__main__":
+    main()
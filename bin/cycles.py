@@ -0,0 +1,272 @@
+# -*- encoding: utf-8 -*-
+"""
+Find the 2-cycles and 3-cycles that a superpermutation passes through.
+
+A 2-cycle is named by a pair (c, p), where c is the last symbol of any of
+its permutations and p the canonical representative of the cycle formed by
+the rest; a 3-cycle by (c, d, p), for the last two symbols and the rest.
+"""
+
+from __future__ import division
+
+import array
+import collections
+import hashlib
+import itertools
+import re
+
+from permscan import permutation_flags
+
+SYMBOLS = "123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+def cyclerep(c):
+    """
+    The canonical representative of the cyclic equivalence class of c
+    """
+    m = min(c)
+    i = c.index(m)
+    return c[i:] + c[:i]
+
+def two_cycle(p):
+    """
+    The 2-cycle determined by the permutation p
+    """
+    return (p[-1], cyclerep(p[:-1]))
+
+def three_cycle(p):
+    """
+    The 3-cycle determined by the permutation p
+    """
+    return (p[-1], p[-2], cyclerep(p[:-2]))
+
+def neighbours(c, p):
+    """
+    The 2-cycles that share a 1-cycle with the 2-cycle (c, p), as triples
+    (c', p', d), where d is true if they share it in the same 3-cycle.
+    """
+    for i in range(len(p)):
+        d = p[:i] + p[i+1:]
+        for j in range(len(p) - 1):
+            yield (p[i], cyclerep(d[:j] + c + d[j:]), i == j)
+
+# The 2-cycle and 3-cycle of each permutation seen by find_cycles, which
+# are looked up far more often than there are permutations
+_cycles = {}
+
+def find_cycles(s, n, flags=None):
+    """
+    The cycles the superpermutation s passes through, as a pair of dicts:
+    one that maps each 2-cycle to the permutations at which s enters its
+    1-cycles, and one that maps each 3-cycle to the 2-cycles at which s
+    enters it. If flags is given, it is permutation_flags(s[:-1], n),
+    perhaps as a bytearray.
+    """
+    if flags is None:
+        flags = permutation_flags(s[:-1], n)
+    windows = str(bytearray(flags))
+
+    # The offsets of the windows where s enters a 1-cycle
+    entries = [ m.start() + 1 for m in re.finditer("\x00\x01", windows) ]
+    if windows.startswith("\x01"):
+        entries.insert(0, 0)
+
+    two_cycles = {}
+    three_cycles = {}
+    current_two_cycle = None
+    for i in entries:
+        p = s[i : i+n]
+        if p not in _cycles:
+            _cycles[p] = (two_cycle(p), three_cycle(p))
+        (ts, thrs) = _cycles[p]
+        if ts != current_two_cycle:
+            # Entering a different 2-cycle
+            three_cycles.setdefault(thrs, []).append(ts)
+        current_two_cycle = ts
+        two_cycles.setdefault(ts, []).append(p)
+    return (two_cycles, three_cycles)
+
+class Graph(object):
+    """
+    A graph in compressed sparse row form: the neighbours of vertex i are
+    targets[offsets[i] : offsets[i+1]], and each of those edges has a flag,
+    which is 1 for an edge drawn in bold by 2cycles.py. Every edge appears
+    once from each end.
+    """
+    def __init__(self, offsets, targets, flags):
+        self.offsets = offsets
+        self.targets = targets
+        self.flags = flags
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def edge_count(self):
+        return len(self.targets) // 2
+
+    def neighbours(self, i):
+        """
+        The neighbours of vertex i, as (j, flag) pairs.
+        """
+        (a, b) = (self.offsets[i], self.offsets[i+1])
+        return zip(self.targets[a:b], self.flags[a:b])
+
+    def subgraph(self, vertices):
+        """
+        The subgraph induced by the vertices, which are numbered
+        in the subgraph by their position in the sorted list.
+        """
+        vertices = sorted(vertices)
+        number = dict((v, i) for (i, v) in enumerate(vertices))
+        offsets = array.array("I", [0])
+        targets = array.array("I")
+        flags = bytearray()
+        for v in vertices:
+            for (w, flag) in self.neighbours(v):
+                if w in number:
+                    targets.append(number[w])
+                    flags.append(flag)
+            offsets.append(len(targets))
+        return Graph(offsets, targets, flags)
+
+    def degrees(self):
+        offsets = self.offsets
+        return [ offsets[i+1] - offsets[i] for i in xrange(len(self)) ]
+
+    def degree_histogram(self):
+        """
+        The number of vertices of each degree, as a sorted list of (degree, count).
+        """
+        return sorted(collections.Counter(self.degrees()).items())
+
+    def components(self):
+        """
+        The connected components, as lists of vertices.
+        """
+        component = [None] * len(self)
+        components = []
+        for v in xrange(len(self)):
+            if component[v] is not None: continue
+            component[v] = len(components)
+            members = [v]
+            stack = [v]
+            while stack:
+                u = stack.pop()
+                for w in self.targets[self.offsets[u] : self.offsets[u+1]]:
+                    if component[w] is None:
+                        component[w] = len(components)
+                        members.append(w)
+                        stack.append(w)
+            components.append(members)
+        return components
+
+    def cycle_rank(self):
+        """
+        The number of independent cycles: 0 if the graph is a forest.
+        """
+        return self.edge_count() - len(self) + len(self.components())
+
+    def is_tree(self):
+        return len(self.components()) == 1 and self.edge_count() == len(self) - 1
+
+    def invariant_hash(self):
+        """
+        A hash of the graph that is the same for isomorphic graphs, by
+        Weisfeiler-Lehman colour refinement: each vertex starts with the
+        colour of its degree, and is repeatedly recoloured by its colour
+        and the multiset of its neighbours' colours and edge flags, until
+        the number of colours stops growing.
+        """
+        colours = self.degrees()
+        history = []
+        while True:
+            signatures = [
+                (colours[v], tuple(sorted([ (colours[w], flag) for (w, flag) in self.neighbours(v) ])))
+                for v in xrange(len(self))
+            ]
+            # Number the signatures in sorted order, so the colours
+            # do not depend on the numbering of the vertices
+            palette = dict((sig, i) for (i, sig) in enumerate(sorted(set(signatures))))
+            history.append(sorted(collections.Counter(signatures).items()))
+            refined = [ palette[sig] for sig in signatures ]
+            if len(palette) == len(set(colours)) and len(history) > 1:
+                break
+            colours = refined
+        return hashlib.sha1(repr(history)).hexdigest()[:16]
+
+class CycleTable(object):
+    """
+    Every 2-cycle and 3-cycle of n symbols, in sorted order, and the graphs
+    on them. Two 2-cycles are adjacent if they share a 1-cycle, as in
+    neighbours(), with the edge flagged if they are in the same 3-cycle;
+    two 3-cycles are adjacent if they share a 2-cycle.
+    """
+    def __init__(self, n):
+        self.n = n
+        symbols = SYMBOLS[:n]
+
+        self.two_cycles = []
+        for c in symbols:
+            rest = symbols.replace(c, "")
+            for q in itertools.permutations(rest[1:]):
+                self.two_cycles.append((c, rest[0] + "".join(q)))
+        self.two_cycle_index = dict((ts, i) for (i, ts) in enumerate(self.two_cycles))
+
+        self.three_cycles = []
+        for c in symbols:
+            for d in symbols.replace(c, ""):
+                rest = symbols.replace(c, "").replace(d, "")
+                for q in itertools.permutations(rest[1:]):
+                    self.three_cycles.append((c, d, rest[0] + "".join(q)))
+        self.three_cycle_index = dict((thrs, i) for (i, thrs) in enumerate(self.three_cycles))
+
+        offsets = array.array("I", [0])
+        targets = array.array("I")
+        flags = bytearray()
+        for (c, p) in self.two_cycles:
+            for (c_, p_, d_) in neighbours(c, p):
+                targets.append(self.two_cycle_index[(c_, p_)])
+                flags.append(d_)
+            offsets.append(len(targets))
+        self.two_cycle_graph = Graph(offsets, targets, flags)
+
+        # The 3-cycles that each 2-cycle is in
+        containing = [ [] for ts in self.two_cycles ]
+        members = []
+        for (i, (c, d, p)) in enumerate(self.three_cycles):
+            two_cycles = [
+                self.two_cycle_index[(c, cyclerep(p[:j] + d + p[j:]))]
+                for j in xrange(len(p))
+            ]
+            members.append(two_cycles)
+            for t in two_cycles:
+                containing[t].append(i)
+
+        offsets = array.array("I", [0])
+        targets = array.array("I")
+        for (i, two_cycles) in enumerate(members):
+            targets.extend(sorted(set([
+                j for t in two_cycles for j in containing[t] if j != i
+            ])))
+            offsets.append(len(targets))
+        self.three_cycle_graph = Graph(offsets, targets, bytearray(len(targets)))
+
+    def graphs(self, two_cycles, three_cycles):
+        """
+        The subgraphs on the 2-cycles and 3-cycles given, such as those
+        found by find_cycles().
+        """
+        return (
+            self.two_cycle_graph.subgraph([ self.two_cycle_index[ts] for ts in two_cycles ]),
+            self.three_cycle_graph.subgraph([ self.three_cycle_index[thrs] for thrs in three_cycles ]),
+        )
+
+# A CycleTable for each n, since building one takes a while
+_tables = {}
+
+def cycle_table(n):
+    """
+    The CycleTable for n symbols.
+    """
+    if n not in _tables:
+        _tables[n] = CycleTable(n)
+    return _tables[n]
@@ -0,0 +1,293 @@
+# -*- encoding: utf-8 -*-
+"""
+Solve exact cover problems, using Knuth's Algorithm X with dancing links.
+
+The rows of a problem are sequences of column labels, which can be any
+hashable objects. Every primary column must be covered exactly once, and
+every secondary column at most once. The labels are numbered once, when
+the problem is compiled, so the search itself only deals with integers;
+and it always chooses the first of the columns with fewest rows, so the
+solutions are generated in the same order every time.
+
+This can be used in place of https://github.com/robinhouston/exactcover:
+
+    for solution in Coverings(rows, secondary):
+        ...
+"""
+
+from __future__ import division
+
+import multiprocessing
+import time
+
+class ExactCover(object):
+    """
+    An exact cover problem, compiled into the arrays of a dancing links
+    structure. Node 0 is the root, nodes 1 to the number of columns are the
+    column headers, and the rest are the 1s of the rows. For each node x,
+    L[x], R[x], U[x] and D[x] are its neighbours, and C[x] its column
+    header; for a column header c, S[c] is the number of rows in the column.
+    Only the primary columns are linked into the list of headers.
+    """
+    def __init__(self, rows, secondary=()):
+        self.rows = list(rows)
+        secondary = set(secondary)
+
+        # Number the columns, primary columns first, in order of appearance
+        self.columns = []
+        column_index = {}
+        row_labels = []
+        for row in self.rows:
+            labels = list(row)
+            for label in labels:
+                if label not in column_index:
+                    column_index[label] = None
+                    self.columns.append(label)
+            row_labels.append(labels)
+        self.columns = [ c for c in self.columns if c not in secondary ] \
+                     + [ c for c in self.columns if c in secondary ]
+        self.primary_count = len(self.columns) - len(secondary.intersection(column_index))
+        for (i, label) in enumerate(self.columns):
+            column_index[label] = i + 1
+        self.row_columns = [ [ column_index[label] for label in labels ] for labels in row_labels ]
+
+        self._link()
+
+    def _link(self):
+        m = len(self.columns)
+        L = range(-1, m)
+        R = range(1, m + 2)
+        L[0] = self.primary_count
+        R[self.primary_count] = 0
+        for c in xrange(self.primary_count + 1, m + 1):
+            L[c] = R[c] = c
+        U = range(m + 1)
+        D = range(m + 1)
+        C = range(m + 1)
+        S = [0] * (m + 1)
+        row_of = [None] * (m + 1)
+
+        for (i, columns) in enumerate(self.row_columns):
+            first = len(C)
+            for (k, c) in enumerate(columns):
+                x = len(C)
+                L.append(x - 1 if k > 0 else first + len(columns) - 1)
+                R.append(x + 1 if k < len(columns) - 1 else first)
+                U.append(U[c])
+                D.append(c)
+                D[U[c]] = x
+                U[c] = x
+                C.append(c)
+                S[c] += 1
+                row_of.append(i)
+
+        (self.L, self.R, self.U, self.D, self.C, self.S) = (L, R, U, D, C, S)
+        self.row_of = row_of
+
+    def solutions(self, prefix=(), resume=(), checkpoint=None, interval=60):
+        """
+        Generate every solution, as a list of row indices. If a prefix is
+        given, generate only the solutions that start with it, as returned
+        by subproblems().
+
+        If checkpoint is given, it is called from time to time, at most once
+        every interval seconds, with the list of row indices chosen on the
+        way down to a node of the search tree whose subtree has just been
+        finished: every solution up to and including those below that node
+        has been generated, and the caller has finished with it. Passing
+        that list as resume makes the search carry on from there.
+        """
+        return self._search(prefix, None, resume, checkpoint, interval)
+
+    def subproblems(self, depth):
+        """
+        Split the search at the given depth, generating the list of row
+        indices chosen on the way down to each node at that depth, or to
+        each solution above it. Each of these can be passed as the prefix
+        to solutions(), and between them they give every solution.
+        """
+        return self._search((), depth)
+
+    def _search(self, prefix, depth, resume=(), checkpoint=None, interval=60):
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+
+        def cover(c):
+            L[R[c]] = L[c]
+            R[L[c]] = R[c]
+            i = D[c]
+            while i != c:
+                j = R[i]
+                while j != i:
+                    D[U[j]] = D[j]
+                    U[D[j]] = U[j]
+                    S[C[j]] -= 1
+                    j = R[j]
+                i = D[i]
+
+        def uncover(c):
+            i = U[c]
+            while i != c:
+                j = L[i]
+                while j != i:
+                    S[C[j]] += 1
+                    D[U[j]] = j
+                    U[D[j]] = j
+                    j = L[j]
+                i = U[i]
+            L[R[c]] = c
+            R[L[c]] = c
+
+        # Cover or uncover the columns of the other nodes in the row of r,
+        # as cover() or uncover() would, but without a call for each column
+        def cover_row(r):
+            k = R[r]
+            while k != r:
+                c = C[k]
+                L[R[c]] = L[c]
+                R[L[c]] = R[c]
+                i = D[c]
+                while i != c:
+                    j = R[i]
+                    while j != i:
+                        D[U[j]] = D[j]
+                        U[D[j]] = U[j]
+                        S[C[j]] -= 1
+                        j = R[j]
+                    i = D[i]
+                k = R[k]
+
+        def uncover_row(r):
+            k = L[r]
+            while k != r:
+                c = C[k]
+                i = U[c]
+                while i != c:
+                    j = L[i]
+                    while j != i:
+                        S[C[j]] += 1
+                        D[U[j]] = j
+                        U[D[j]] = j
+                        j = L[j]
+                    i = U[i]
+                L[R[c]] = c
+                R[L[c]] = c
+                k = L[k]
+
+        def choose():
+            # The first column with the fewest rows
+            c = j = R[0]
+            while j != 0:
+                if S[j] < S[c]:
+                    c = j
+                    if S[c] == 0: break
+                j = R[j]
+            return c
+
+        # The nodes of the rows chosen so far, one for each level of the search
+        chosen = []
+
+        def replay(i):
+            # Choose row i, as the search would have at this level
+            c = choose()
+            cover(c)
+            r = D[c]
+            while r != c and self.row_of[r] != i:
+                r = D[r]
+            if r == c:
+                uncover(c)
+                raise ValueError("Row %d can't be chosen at depth %d" % (i, len(chosen)))
+            chosen.append(r)
+            cover_row(r)
+
+        # When the next checkpoint is due
+        due = [ time.time() + interval ]
+
+        def backtrack():
+            # The subtree below the last row chosen is finished, so move on from it
+            if checkpoint is not None and time.time() >= due[0]:
+                checkpoint([ self.row_of[x] for x in chosen ])
+                due[0] = time.time() + interval
+            r = chosen.pop()
+            uncover_row(r)
+            return r
+
+        try:
+            for i in prefix:
+                replay(i)
+            base = len(chosen)
+            for i in resume:
+                replay(i)
+
+            # Whether to search below the last row chosen, rather than move on from it
+            descend = not resume
+            while True:
+                if descend and R[0] != 0 and len(chosen) != depth:
+                    c = choose()
+                    cover(c)
+                    r = D[c]
+                else:
+                    if descend:
+                        yield [ self.row_of[x] for x in chosen ]
+                    if len(chosen) == base: return
+                    r = backtrack()
+                    c = C[r]
+                    r = D[r]
+
+                # Backtrack until there is a row left to try
+                while r == c:
+                    uncover(c)
+                    if len(chosen) == base: return
+                    r = backtrack()
+                    c = C[r]
+                    r = D[r]
+
+                chosen.append(r)
+                cover_row(r)
+                descend = True
+        finally:
+            # Leave the links as they were, so the problem can be searched again
+            while chosen:
+                r = chosen.pop()
+                uncover_row(r)
+                uncover(C[r])
+
+def Coverings(rows, secondary=(), resume=(), checkpoint=None, interval=60):
+    """
+    Generate every exact cover of the rows, as a list of the rows themselves,
+    where the columns in secondary need not be covered. The checkpoint
+    arguments are as for ExactCover.solutions().
+    """
+    problem = ExactCover(rows, secondary)
+    for solution in problem.solutions(resume=resume, checkpoint=checkpoint, interval=interval):
+        yield [ problem.rows[i] for i in solution ]
+
+# The problem that parallel_coverings() is solving, and the function it
+# applies to each solution, which the worker processes inherit
+_parallel = None
+
+def _solve_subproblem(prefix):
+    (problem, f) = _parallel
+    return [
+        f([ problem.rows[i] for i in solution ])
+        for solution in problem.solutions(prefix)
+    ]
+
+def parallel_coverings(rows, secondary=(), depth=3, processes=None, f=None):
+    """
+    Like Coverings, but split the search at the given depth into subproblems
+    that are solved by a pool of worker processes, each of which takes the
+    next subproblem as soon as it has finished the last. The solutions come
+    out in no particular order. If f is given, the workers apply it to each
+    solution, and f(solution) is generated instead.
+    """
+    global _parallel
+    problem = ExactCover(rows, secondary)
+    _parallel = (problem, f or (lambda solution: solution))
+    pool = multiprocessing.Pool(processes)
+    try:
+        for results in pool.imap_unordered(_solve_subproblem, problem.subproblems(depth)):
+            for result in results:
+                yield result
+    finally:
+        pool.terminate()
+        _parallel = None
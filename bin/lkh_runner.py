@@ -1,23 +1,40 @@
 #!/usr/bin/python
 # -*- encoding: utf-8 -*-
 
+import gzip
 import random
 import os
+import shutil
+import signal
 import sys
 import subprocess
+import time
+
+from permrank import SYMBOLS
+from resultstore import ResultStore, superpermutation_to_tour, tour_to_superpermutation
+from tsplib import read_tour, write_tour
 
 
 def print_help():
-    print('Usage: lkh_runner.py -s LKH -o OUT_DIR -p PROBLEM -n NUMBER -w WEIGHT -r RUNS')
+    print('Usage: lkh_runner.py -s LKH -o OUT_DIR -p PROBLEM -n NUMBER -w WEIGHT -r RUNS --workers WORKERS -d DATABASE --warm POOL --known PATH')
     print("    -s   Path to the lkh software. Default 'LKH'.")
     print("    -o   Output path. All lkh input files and output tour files are generated in this directory.\n"
-          "         The directory is created if it does not exists. When running multiple instances it is\n"
-          "         recommended to use different output directories.")
+          "         The directory is created if it does not exists. To run several LKH processes at once,\n"
+          "         use --workers rather than running several instances.")
     print("    -p   Problem file. Default: 'atsp/6.atsp'.")
     print("    -n   The problem number. Default: '6'.")
     print("    -w   Maximum weight of the solutions to keep. Default: '866'.")
     print("    -r   The number of run executed by LKH on each iteration. Default: '50'."
           "Greater means slightly better performance but some solutions might be discarded.")
+    print("    --workers  The number of LKH processes to run at the same time, each with its own seed,\n"
+          "         all writing to the same output directory. Default: '1'.")
+    print("    -d   The database in which the tours found are recorded, so that duplicates are discarded.\n"
+          "         Default: 'results.sqlite' in the output directory.")
+    print("    --best  Instead of running LKH, print this many of the best superpermutations in the database.")
+    print("    --warm  Start each LKH process from one of the best tours found so far, and merge its tours\n"
+          "         with another. The tours are taken in turn from a pool of this size. Default: '0' (off).")
+    print("    --known  A file of known superpermutations, or a directory of such files, to add to the pool\n"
+          "         of tours used by --warm, e.g. 'superpermutations/6/'.")
     print("    -h   Display this help message.")
 
 
@@ -55,18 +72,40 @@ def get_args():
     max_weight = myargs.get('-w', 866)
     number = myargs.get('-n', 6)
     runs = myargs.get('-r', 50)
+    workers = myargs.get('--workers', 1)
+    database = myargs.get('-d', os.path.join(directory, 'results.sqlite'))
+    warm = myargs.get('--warm', 0)
+    known = myargs.get('--known')
+
+    if '--best' in myargs:
+        print_best(database, int(number), int(myargs['--best']))
+        sys.exit()
 
-    return lkh, directory, problem, int(max_weight), int(number), int(runs)
+    return lkh, directory, problem, int(max_weight), int(number), int(runs), int(workers), database, int(warm), known
 
 
-def generate_input_file(directory, problem, seed, number, runs):
+def generate_input_file(directory, problem, seed, number, runs, warm_start=None):
     print(seed)
+    run_directory = os.path.join(directory, str(seed))
+    os.mkdir(run_directory)
+
+    tour_files = ''
+    if warm_start is not None:
+        initial, merge = warm_start
+        initial_file = os.path.join(run_directory, 'initial.tour')
+        write_tour(initial_file, 'initial', superpermutation_to_tour(number, initial))
+        tour_files += 'INITIAL_TOUR_FILE = {}\n'.format(initial_file)
+        if merge != initial:
+            merge_file = os.path.join(run_directory, 'merge.tour')
+            write_tour(merge_file, 'merge', superpermutation_to_tour(number, merge))
+            tour_files += 'MERGE_TOUR_FILE = {}\n'.format(merge_file)
+
     filename = '{}/{}.par.{}'.format(directory, number, seed)
     file = open(filename, 'w')
     file.write(
         '''
 PROBLEM_FILE = {prob}
-OUTPUT_TOUR_FILE = {dir}/{n}.$.lkh.{seed}
+OUTPUT_TOUR_FILE = {dir}/{seed}/{n}.$.lkh
 RUNS = {runs}
 MAX_TRIALS = 3000
 BACKTRACKING = YES
@@ -76,29 +115,182 @@ MOVE_TYPE = 3
 PATCHING_C = 3
 PATCHING_A = 2
 SEED = {seed}
-EOF'''.format(dir=directory, prob=problem, seed=seed, n=number, runs=runs)
+{tour_files}EOF'''.format(dir=directory, prob=problem, seed=seed, n=number, runs=runs, tour_files=tour_files)
     )
     file.close()
     return filename
 
 
-def cleanup_results(directory, max_weight):
-    for file in os.listdir(directory):
+def collect_results(directory, seed, max_weight, store):
+    """
+    Record the tours found by the LKH process with the given seed,
+    which are in their own subdirectory of the output directory.
+    Novel tours up to the maximum weight are moved into the output
+    directory, and the rest are discarded.
+    """
+    run_directory = os.path.join(directory, str(seed))
+    if not os.path.isdir(run_directory):
+        return
+    for file in os.listdir(run_directory):
         file_parts = file.split('.')
-        if len(file_parts) == 4 and file_parts[2] == 'lkh':
-            if int(file_parts[1]) > max_weight:
+        path = os.path.join(run_directory, file)
+        if len(file_parts) == 3 and file_parts[2] == 'lkh':
+            number, weight = int(file_parts[0]), int(file_parts[1])
+            if weight > max_weight:
                 print('Removing uninteresting solution file: {}\n'.format(file))
-                os.remove(os.path.join(directory, file))
+            elif not store.add(number, tour_to_superpermutation(number, read_tour(path)), seed):
+                print('Removing duplicate solution file: {}\n'.format(file))
+            else:
+                os.rename(path, os.path.join(directory, '{}.{}.lkh.{}'.format(number, weight, seed)))
+    shutil.rmtree(run_directory)
+
+
+def read_known(path, number, count):
+    """
+    Read the shortest few superpermutations on the given number of symbols
+    from a file, or from all the files under a directory, ignoring anything else.
+    """
+    if os.path.isdir(path):
+        filenames = sorted(
+            os.path.join(dirpath, filename)
+            for (dirpath, dirnames, filenames) in os.walk(path)
+            for filename in filenames
+        )
+    else:
+        filenames = [path]
+
+    symbols = set(SYMBOLS[:number])
+    candidates = set()
+    for filename in filenames:
+        opener = gzip.open if filename.endswith('.gz') else open
+        with opener(filename, 'r') as f:
+            for line in f:
+                line = line.split('#')[0].strip()
+                if set(line) == symbols:
+                    candidates.add(line)
+
+    known = []
+    for s in sorted(candidates, key=len):
+        if len(known) == count:
+            break
+        try:
+            superpermutation_to_tour(number, s)
+        except ValueError:
+            continue
+        known.append(s)
+    return known
+
+
+class ElitePool(object):
+    """
+    The best tours known, from the result store and from the known superpermutations,
+    which are handed out in turn to start LKH processes from.
+    """
+    def __init__(self, store, number, size, known):
+        self.store = store
+        self.number = number
+        self.size = size
+        self.known = known
+        self.turn = 0
+
+    def tours(self):
+        tours = set(self.known)
+        tours.update(s for (weight, s) in self.store.best(self.number, self.size))
+        return sorted(tours, key=len)[:self.size]
+
+    def next_warm_start(self):
+        """
+        The superpermutations to use as the initial tour and the merge tour
+        for the next LKH process, or None if there aren't any yet.
+        """
+        tours = self.tours()
+        if not tours:
+            return None
+        self.turn += 1
+        return tours[self.turn % len(tours)], tours[(self.turn + 1) % len(tours)]
+
+
+def print_best(database, number, count):
+    store = ResultStore(database)
+    for weight, superpermutation in store.best(number, count):
+        print('{} {}'.format(weight, superpermutation))
+    store.close()
+
+
+def start_worker(lkh, directory, problem, number, runs, seeds_in_use, elite):
+    seed = random.randrange(1, 2147483647)
+    while seed in seeds_in_use:
+        seed = random.randrange(1, 2147483647)
+    warm_start = elite.next_warm_start() if elite is not None else None
+    input_file = generate_input_file(directory, problem, seed, number, runs, warm_start)
+    return subprocess.Popen([lkh, input_file]), seed, input_file
+
+
+def stop_workers(workers, directory, max_weight, store):
+    # Don't let a second Ctrl+C interrupt the shutdown
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    for (process, seed, input_file) in workers.values():
+        try:
+            process.terminate()
+        except OSError:
+            pass  # It has already exited
+    for (process, seed, input_file) in workers.values():
+        process.wait()
+        if os.path.exists(input_file):
+            os.remove(input_file)
+        collect_results(directory, seed, max_weight, store)
+
+
+def describe_status(status):
+    """
+    Describe the exit status of a process, as returned by os.wait().
+    """
+    if os.WIFSIGNALED(status):
+        return 'was killed by signal {}'.format(os.WTERMSIG(status))
+    return 'exited with status {}'.format(os.WEXITSTATUS(status))
 
 
 def main():
-    lkh, directory, problem, max_weight, number, runs = get_args()
+    lkh, directory, problem, max_weight, number, runs, n_workers, database, warm, known = get_args()
+    store = ResultStore(database)
+    elite = None
+    if warm > 0:
+        elite = ElitePool(store, number, warm, read_known(known, number, warm) if known else [])
+
+    # Treat SIGTERM (e.g. from docker stop) the same way as Ctrl+C
+    def interrupt(signum, frame):
+        raise KeyboardInterrupt()
+    signal.signal(signal.SIGTERM, interrupt)
+
+    workers = {}  # Map pid to (process, seed, input_file)
+    try:
+        while True:
+            seeds_in_use = set(seed for (process, seed, input_file) in workers.values())
+            while len(workers) < n_workers:
+                process, seed, input_file = start_worker(lkh, directory, problem, number, runs, seeds_in_use, elite)
+                workers[process.pid] = (process, seed, input_file)
+                seeds_in_use.add(seed)
 
-    while True:
-        input_file = generate_input_file(directory, problem, random.randrange(1, 2147483647), number, runs)
-        subprocess.call([lkh, input_file])
-        os.remove(input_file)
-        cleanup_results(directory, max_weight)
+            pid, status = os.wait()
+            if pid not in workers:
+                continue
+            process, seed, input_file = workers[pid]
+            del workers[pid]
+            process.returncode = status
+            os.remove(input_file)
+            collect_results(directory, seed, max_weight, store)
+            if status != 0:
+                print('LKH with seed {} {}; restarting it'.format(seed, describe_status(status)))
+                time.sleep(1)  # Don't spin if LKH is failing immediately
+    except KeyboardInterrupt:
+        pass
+    finally:
+        # Whatever went wrong, don't leave LKH running or its files behind
+        if workers:
+            print('Stopping {} LKH process(es)'.format(len(workers)))
+            stop_workers(workers, directory, max_weight, store)
+        store.close()
 
 
 if __name__ == '__main__':
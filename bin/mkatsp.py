@@ -30,6 +30,20 @@ perms = list(permutations(range(N)))
 n_perms = len(perms)
 ordered = tuple(range(N))
 
+# Permutations are encoded by their index in the lexicographically ordered
+# list perms, which is also their node number (minus one) in the output.
+index = dict((p, i) for (i, p) in enumerate(perms))
+
+def block(prefix):
+    """
+    The index of the first permutation that starts with prefix.
+
+    The permutations that start with a given prefix of length N-k form
+    a contiguous block of k! entries in perms, so a row of the matrix
+    can be filled in a block at a time rather than an entry at a time.
+    """
+    return index[prefix + tuple(sorted(set(ordered) - set(prefix)))]
+
 def is_improper(p, q, weight):
     if weight == INF:
         return True
@@ -42,35 +56,84 @@ def is_improper(p, q, weight):
             return True
     return False
 
-def distance(p, q):
-    if q == ordered: return 0
-    
-    weight = INF
+def mark_improper(row, start, prefix):
+    """
+    Mark as improper the edges p -> q into the block of permutations that
+    starts at index start, where q ends with a rearrangement r of prefix.
+    Such an edge is improper if some proper prefix of r is a rearrangement
+    of the prefix of p with the same length.
+
+    Whenever the first few symbols of r already decide the question, the
+    whole sub-block of permutations that start that way is marked at once.
+    """
+    m = len(prefix)
+    position = dict((c, i) for (i, c) in enumerate(prefix))
+    sizes = [ math.factorial(k) for k in range(m) ]
+
+    def visit(start, remaining, depth, last):
+        size = sizes[m - depth - 1]
+        j = start
+        for (i, c) in enumerate(remaining):
+            last_ = position[c]
+            if last_ < last: last_ = last
+            if last_ == m - 1:
+                pass
+            elif last_ == depth:
+                row[j : j+size] = [INF] * size
+            else:
+                visit(j, remaining[:i] + remaining[i+1:], depth + 1, last_)
+            j += size
+
+    visit(start, sorted(prefix), 0, -1)
+
+def default_weight():
+    """
+    The weight of an edge p -> q where q does not overlap p
+    by as much as the bound requires.
+    """
+    if options.simple or max_weight < N:
+        return INF
+    return N
+
+def weights(p):
+    """
+    The weights of the edges from p to every permutation, in order.
+    """
+    row = [ default_weight() ] * n_perms
+
     if options.simple:
-        for n in range(max_weight+1):
-            if p[n:] + tuple(reversed(p[:n])) == q:
-                weight = n
-                break
+        targets = [ index[p[n:] + tuple(reversed(p[:n]))] for n in range(min(max_weight, N) + 1) ]
+        for n in range(len(targets) - 1, -1, -1):
+            row[targets[n]] = n
+        if options.proper:
+            for j in targets:
+                if is_improper(p, perms[j], row[j]):
+                    row[j] = INF
     else:
-        for n in range(max_weight+1):
-            if p[n:] == q[:N-n]:
-                weight = n
-                break
+        if options.proper and row[0] != INF:
+            mark_improper(row, 0, p)
 
-    if options.proper and is_improper(p, q, weight):
-        return INF
-    
-    if weight > 1 and options.no_cyclic:
-        sp = "".join([ SYMBOLS[i] for i in p ])
-        sq = "".join([ SYMBOLS[i] for i in q ])
-        if sp in sq+sq: return INF
-    
-    return weight
+        # The edges of weight n < N go to the permutations that start with p[n:],
+        # and these blocks are disjoint for different values of n.
+        for n in range(1, min(max_weight, N - 1) + 1):
+            j = block(p[n:])
+            row[j : j+math.factorial(n)] = [n] * math.factorial(n)
+            if options.proper:
+                mark_improper(row, j, p[:n])
+        row[index[p]] = 0
+
+    if options.no_cyclic:
+        for n in range(N):
+            j = index[p[n:] + p[:n]]
+            if row[j] > 1: row[j] = INF
+
+    row[index[ordered]] = 0
+    return row
 
 if options.counts:
     counts = defaultdict(int)
-    for q in perms:
-        counts[distance(ordered, q)] += 1
+    for weight in weights(ordered):
+        counts[weight] += 1
     for w, c in counts.iteritems():
         print "{0}: {1} ({2:.3f})".format(w, c, c/math.factorial(N))
     exit(0)
@@ -85,5 +148,7 @@ print "DISPLAY_DATA_TYPE : NO_DISPLAY"
 
 print "EDGE_WEIGHT_SECTION :"
 
+labels = dict((w, str(w)) for w in range(max(max_weight, N) + 1))
+labels[INF] = str(INF)
 for p in perms:
-    print " ".join([ str(distance(p, q)) for q in perms ])
+    print " ".join(map(labels.__getitem__, weights(p)))
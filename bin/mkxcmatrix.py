@@ -0,0 +1,25 @@
+#!/usr/bin/python
+# -*- encoding: utf-8 -*-
+"""
+Build the exact cover matrix of one of the families of problems solved by
+xc.py and xc2.py, and save it in the binary format described in xcmatrix.py,
+so that xc.py --matrix can load it without building it again.
+"""
+
+from __future__ import division
+
+import optparse
+
+import xcmatrix
+
+parser = optparse.OptionParser(usage="%prog [options] FAMILY N OUTPUT")
+
+(options, args) = parser.parse_args()
+if len(args) != 3: parser.error("Wrong number of arguments")
+(family, n, output_filename) = args
+if family not in xcmatrix.FAMILIES:
+    parser.error("Unknown family %s: choose from %s" % (family, ", ".join(sorted(xcmatrix.FAMILIES))))
+
+rows, secondary = xcmatrix.build(family, int(n))
+with open(output_filename, 'wb') as out:
+    xcmatrix.write(out, family, int(n), rows, secondary)
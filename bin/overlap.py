@@ -0,0 +1,47 @@
+# -*- encoding: utf-8 -*-
+"""
+Overlapping strings, and squashing a sequence of strings into one.
+"""
+
+from __future__ import division
+
+def overlap(x, y):
+    """
+    The length of the longest suffix of x that is a prefix of y.
+    """
+    for i in range(min(len(x), len(y)), -1, -1):
+        if x.endswith(y[:i]):
+            return i
+
+def _suffix(pieces, k):
+    """
+    The last k characters of the concatenation of pieces,
+    or all of them if there are fewer than k.
+    """
+    r = []
+    length = 0
+    for piece in reversed(pieces):
+        if length >= k: break
+        r.append(piece)
+        length += len(piece)
+    return "".join(reversed(r))[-k:]
+
+def squash(xs):
+    """
+    Concatenate the strings xs, eliminating the overlap between each one
+    and the string built so far.
+
+    Only the last few characters of the string built so far can overlap
+    the next string, so only those are compared, and the pieces are joined
+    at the end. This takes time linear in the length of the result
+    (for strings of bounded length), rather than quadratic.
+    """
+    pieces = []
+    tail = ""
+    for y in xs:
+        if len(tail) < len(y):
+            tail = _suffix(pieces, len(y))
+        piece = y[overlap(tail, y):]
+        pieces.append(piece)
+        tail = (tail + piece)[-len(y):]
+    return "".join(pieces)
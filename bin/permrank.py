@@ -0,0 +1,128 @@
+# -*- encoding: utf-8 -*-
+"""
+Number the permutations of n symbols from 0 to n! - 1, in lexicographic
+order (the order itertools.permutations generates them in), so that sets
+of permutations can be stored as bitsets rather than as sets of strings.
+"""
+
+from __future__ import division
+
+from math import factorial
+
+SYMBOLS = "123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+def rank(p, symbols=SYMBOLS):
+    """
+    The index of the permutation p of symbols[:len(p)] in the lexicographic
+    ordering of all such permutations, as generated by itertools.permutations.
+    """
+    remaining = list(symbols[:len(p)])
+    r = 0
+    for c in p:
+        i = remaining.index(c)
+        r = r * len(remaining) + i
+        del remaining[i]
+    return r
+
+def unrank(r, n, symbols=SYMBOLS):
+    """
+    The permutation of symbols[:n] with the given rank, as a string.
+    """
+    remaining = list(symbols[:n])
+    p = []
+    for k in range(n - 1, -1, -1):
+        (i, r) = divmod(r, factorial(k))
+        p.append(remaining.pop(i))
+    return "".join(p)
+
+class Ranker(object):
+    """
+    Rank permutations of a fixed number of symbols quickly,
+    using a table lookup for each half of the permutation.
+
+    The first k symbols of p determine its rank up to a multiple of (n-k)!,
+    and the set of symbols that remain for the rest. Translating the rest
+    to the first n-k symbols, in the same relative order, then gives a
+    permutation whose rank is the remainder.
+    """
+    # Use tables with at most about this many entries
+    MAX_TABLE = 10000
+
+    def __init__(self, n, symbols=SYMBOLS):
+        self.n = n
+        self.symbols = symbols[:n]
+        k = 0
+        while k < n and factorial(n) // factorial(n - k - 1) <= self.MAX_TABLE:
+            k += 1
+        self.k = k
+        if factorial(n - k) > self.MAX_TABLE:
+            self.prefixes = None
+            return
+
+        # The ranks of permutations of the first n-k symbols
+        self.suffixes = dict(
+            (unrank(r, n - k, symbols), r)
+            for r in range(factorial(n - k))
+        )
+
+        # For each possible prefix of length k, the rank of the first
+        # permutation that starts with it, and the translation of the
+        # remaining symbols to the first n-k symbols
+        self.prefixes = {}
+        self._add_prefixes("", self.symbols)
+
+    def _add_prefixes(self, prefix, remaining):
+        if len(prefix) == self.k:
+            table = [ chr(i) for i in range(256) ]
+            for (i, c) in enumerate(remaining):
+                table[ord(c)] = self.symbols[i]
+            self.prefixes[prefix] = (rank(prefix + remaining, self.symbols), "".join(table))
+            return
+        for (i, c) in enumerate(remaining):
+            self._add_prefixes(prefix + c, remaining[:i] + remaining[i+1:])
+
+    def __call__(self, p):
+        """
+        The rank of the permutation p of the n symbols.
+        """
+        if self.prefixes is None:
+            return rank(p, self.symbols)
+        (base, table) = self.prefixes[p[:self.k]]
+        return base + self.suffixes[p[self.k:].translate(table)]
+
+class PermutationSet(object):
+    """
+    A set of permutations of n symbols, stored as a bitset of their ranks.
+    """
+    def __init__(self, n):
+        self.n = n
+        self.bits = bytearray((factorial(n) + 7) // 8)
+        self.size = 0
+
+    def add(self, r):
+        """
+        Add the permutation with rank r to the set,
+        returning True if it was not already there.
+        """
+        (i, bit) = (r >> 3, 1 << (r & 7))
+        if self.bits[i] & bit:
+            return False
+        self.bits[i] |= bit
+        self.size += 1
+        return True
+
+    def __contains__(self, r):
+        return bool(self.bits[r >> 3] & (1 << (r & 7)))
+
+    def __len__(self):
+        return self.size
+
+    def is_complete(self):
+        return self.size == factorial(self.n)
+
+    def __iter__(self):
+        for (i, byte) in enumerate(self.bits):
+            if byte:
+                for j in range(8):
+                    if byte & (1 << j):
+                        yield 8 * i + j
@@ -0,0 +1,75 @@
+# -*- encoding: utf-8 -*-
+"""
+Find the permutations in a string, by sliding a window of length n along it.
+
+The window is tracked incrementally: a count of each symbol in the window,
+and of how many positions are "bad" (a repeated symbol, or one that is not
+among the first n symbols), is updated as one character enters the window
+and one leaves. So each step takes constant time, however large n is.
+"""
+
+from __future__ import division
+
+from permrank import SYMBOLS, Ranker
+
+def permutation_flags(s, n, symbols=SYMBOLS):
+    """
+    Generate one boolean for each length-n window of s, in order,
+    saying whether that window is a permutation of symbols[:n].
+    """
+    if len(s) < n:
+        return
+
+    # code[c] is the index of c in symbols[:n], or n if it isn't there
+    code = [n] * 256
+    for (i, c) in enumerate(symbols[:n]):
+        code[ord(c)] = i
+    codes = [ code[x] for x in bytearray(s) ]
+
+    counts = [0] * (n + 1)
+    bad = 0
+    for x in codes[:n]:
+        if x == n or counts[x] > 0: bad += 1
+        counts[x] += 1
+    yield bad == 0
+
+    for i in xrange(n, len(codes)):
+        old, new = codes[i - n], codes[i]
+        if old != new:
+            counts[old] -= 1
+            if old == n or counts[old] > 0: bad -= 1
+            if new == n or counts[new] > 0: bad += 1
+            counts[new] += 1
+        yield bad == 0
+
+def permutation_offsets(s, n, symbols=SYMBOLS):
+    """
+    The offsets in s of all the length-n windows that are permutations.
+    """
+    return [ i for (i, flag) in enumerate(permutation_flags(s, n, symbols)) if flag ]
+
+# The rankers made so far, which are kept since they take a while to make
+_rankers = {}
+
+def scan(s, n, symbols=SYMBOLS):
+    """
+    Generate (offset, rank) for every length-n window of s
+    that is a permutation of symbols[:n].
+    """
+    if symbols[:n] not in _rankers:
+        _rankers[symbols[:n]] = Ranker(n, symbols)
+    rank = _rankers[symbols[:n]]
+    for i in permutation_offsets(s, n, symbols):
+        yield (i, rank(s[i : i+n]))
+
+def infer_n(s):
+    """
+    The number of symbols of the superpermutation s, which starts with
+    a permutation: the length of its longest prefix with no repeats.
+    """
+    seen = set()
+    for (i, c) in enumerate(s):
+        if c in seen:
+            return i
+        seen.add(c)
+    return len(s)
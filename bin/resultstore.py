@@ -0,0 +1,103 @@
+# -*- encoding: utf-8 -*-
+"""
+An indexed store of the superpermutations found by lkh_runner.py.
+
+Each tour is stored as the superpermutation it represents, keyed by the
+SHA-256 hash of that string, in a SQLite database. Adding a tour is a
+single indexed insert, duplicates are rejected, and the best tours can
+be found by weight without looking at the output directory at all.
+"""
+
+from __future__ import division
+
+import hashlib
+import sqlite3
+
+from overlap import squash
+from permrank import PermutationSet, unrank
+from permscan import scan
+
+def tour_to_superpermutation(n, tour):
+    """
+    The superpermutation represented by a tour of the ATSP instance made
+    by mkatsp.py, where node i is the i'th permutation in lexicographic
+    order (counting from 1). The tour is read starting from node 1,
+    which is where the zero-weight edges lead, whatever node it is
+    listed from.
+    """
+    if 1 in tour:
+        i = tour.index(1)
+        tour = tour[i:] + tour[:i]
+
+    return squash(unrank(ix - 1, n) for ix in tour)
+
+def superpermutation_hash(s):
+    """
+    The key under which the superpermutation s is stored.
+    """
+    return hashlib.sha256(s).hexdigest()
+
+class ResultStore(object):
+    def __init__(self, filename):
+        self.db = sqlite3.connect(filename)
+        # Superpermutations are ASCII, and are wanted as str rather than unicode
+        self.db.text_factory = str
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS tours (
+                hash TEXT PRIMARY KEY,
+                n INTEGER NOT NULL,
+                weight INTEGER NOT NULL,
+                superpermutation TEXT NOT NULL,
+                seed INTEGER,
+                t_created TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        self.db.execute("CREATE INDEX IF NOT EXISTS tours_by_weight ON tours (n, weight)")
+        self.db.commit()
+
+    def add(self, n, s, seed=None):
+        """
+        Add the superpermutation s on n symbols to the store,
+        returning True if it is new and False if it was already there.
+        """
+        cursor = self.db.execute(
+            "INSERT OR IGNORE INTO tours (hash, n, weight, superpermutation, seed) VALUES (?, ?, ?, ?, ?)",
+            (superpermutation_hash(s), n, len(s) - n, s, seed)
+        )
+        self.db.commit()
+        return cursor.rowcount == 1
+
+    def __contains__(self, s):
+        cursor = self.db.execute("SELECT 1 FROM tours WHERE hash = ?", (superpermutation_hash(s),))
+        return cursor.fetchone() is not None
+
+    def best(self, n, count):
+        """
+        The count lowest-weight superpermutations on n symbols,
+        as a list of (weight, superpermutation) pairs.
+        """
+        return self.db.execute(
+            "SELECT weight, superpermutation FROM tours WHERE n = ? ORDER BY weight, t_created LIMIT ?",
+            (n, count)
+        ).fetchall()
+
+    def __len__(self):
+        return self.db.execute("SELECT COUNT(*) FROM tours").fetchone()[0]
+
+    def close(self):
+        self.db.close()
+
+def superpermutation_to_tour(n, s):
+    """
+    The tour of the ATSP instance made by mkatsp.py that visits the
+    permutations in the order they first appear in the superpermutation s.
+    This is the inverse of tour_to_superpermutation, up to rotation.
+    """
+    tour = []
+    seen = PermutationSet(n)
+    for (i, r) in scan(s, n):
+        if seen.add(r):
+            tour.append(r + 1)
+    if not seen.is_complete():
+        raise ValueError("Not a superpermutation on %d symbols" % (n,))
+    return tour
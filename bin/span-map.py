@@ -4,19 +4,15 @@ from __future__ import division
 
 import sys
 
-SYMBOLS = "123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+from permscan import permutation_flags
 
 n_str = sys.argv[1]
 n = int(n_str)
 
-sorted_perm = list(SYMBOLS[:n])
-
 def split_superperm(superperm):
     k = 0
-    for i in range(len(superperm) - n + 1):
-        p = superperm[i : i + n]
-        s = sorted(p)
-        if s == sorted_perm: k += 1
+    for is_permutation in permutation_flags(superperm, n):
+        if is_permutation: k += 1
         else:
             print k,
             k = 0
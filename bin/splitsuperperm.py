@@ -6,42 +6,21 @@ import argparse
 import math
 import sys
 
-SYMBOLS = "123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+from permrank import PermutationSet
+from permscan import infer_n, permutation_flags, scan
 
 def permutations(n, superperm):
-    yield superperm[0:n] # The first length-n substring should be a permutation
-    counts = {SYMBOLS[i]: 1 for i in range(n)}
-    duplicates = 0
-    for i in range(1, len(superperm) - n + 1):
-        old_char = superperm[i-1]
-        new_char = superperm[i+n-1]
-        if old_char != new_char:
-            counts[old_char] -= 1
-            counts[new_char] += 1
-            # number of duplicates may have changed
-            if counts[old_char] == 1:
-                duplicates -= 1
-            if counts[new_char] == 2:
-                duplicates += 1
-        if duplicates == 0: yield superperm[i : i + n]
+    for (i, is_permutation) in enumerate(permutation_flags(superperm, n)):
+        if is_permutation: yield superperm[i : i + n]
         else: yield '...'
 
 
-def infer_n(superperm):
-    """ The first n elements should be a permutation, so we can infer n """
-    seen = set()
-    for i, c in enumerate(superperm):
-        if c in seen:
-            return i
-        else:
-            seen.add(c)
-    return i
-
-
 def split_superperm(superperm, opts):
     n = infer_n(superperm)
     if opts.count:
-        perms = set(p for p in permutations(n, superperm) if p != '...')
+        perms = PermutationSet(n)
+        for (i, r) in scan(superperm, n):
+            perms.add(r)
         perm_count = len(perms)
         expected = math.factorial(n)
         print '{}{}'.format(perm_count, '*' if perm_count == expected else '')
@@ -0,0 +1,195 @@
+# -*- encoding: utf-8 -*-
+"""
+Find the symmetries of the exact cover problems made by xc.py and xc2.py,
+and use them so that only one solution is found in each class of solutions
+that are the same up to relabelling the symbols and reversal.
+
+The column labels of those problems, as built by xcmatrix.py, are strings:
+either one-cycles, as the least rotation of a word, or secondary columns,
+which are "*" followed by a word.
+
+A symmetry is a permutation of the symbols, possibly followed by reversing
+every word, that takes each row to a row. It must fix the set of one-cycles
+that are not covered by any row, i.e. those of the principal cycles, which
+is checked first since it is quick; and then it is checked that every row
+really is taken to a row.
+
+To choose one solution in each class, we pick a primary column, and order
+solutions by which of the rows covering that column they use, and then by
+the (sorted) indices of all their rows. A solution is canonical if no
+symmetry takes it to a smaller one. A canonical solution must use the first
+row of its orbit under the symmetries that fix the chosen column, so the
+other rows covering that column can be left out of the problem altogether.
+
+The solutions in a class need not give equivalent superpermutations, since
+the walk that turns a solution into a superpermutation always starts from
+the same permutation; so the caller should walk every solution in the class
+of each canonical one, which orbit() gives, and keep one superpermutation
+for each value of normalise().
+"""
+
+from __future__ import division
+
+import itertools
+
+def cyclerep(w):
+    """
+    The least rotation of the word w, which has no repeated symbols.
+    """
+    i = w.index(min(w))
+    return w[i:] + w[:i]
+
+def normalise(s, symbols):
+    """
+    The superpermutation s, or its reverse, relabelled so that the symbols
+    appear in order: the same for any two that differ only by relabelling
+    and reversal.
+    """
+    forms = []
+    for w in (s, s[::-1]):
+        table = {}
+        for c in w:
+            if c not in table:
+                table[c] = symbols[len(table)]
+        forms.append("".join([ table[c] for c in w ]))
+    return min(forms)
+
+def relabelling(symbols, image, reverse):
+    """
+    The map of column labels that replaces each symbol with the symbol
+    at the same position in image, and then reverses the word if reverse.
+    """
+    table = dict(zip(symbols, image))
+    def f(label):
+        if label.startswith("*"):
+            w = "".join([ table[c] for c in label[1:] ])
+            return "*" + (w[::-1] if reverse else w)
+        w = "".join([ table[c] for c in label ])
+        return cyclerep(w[::-1] if reverse else w)
+    return f
+
+class Symmetries(object):
+    """
+    The symmetries of the exact cover problem whose rows are given,
+    where the words are made of the given symbols.
+    """
+    def __init__(self, rows, symbols):
+        self.rows = list(rows)
+        self.index = dict((row, i) for (i, row) in enumerate(self.rows))
+        row_sets = dict((frozenset(row), i) for (i, row) in enumerate(self.rows))
+
+        # The one-cycles of the principal cycles, which are not in any row
+        one_cycles = set([
+            label for row in self.rows for label in row
+            if not label.startswith("*")
+        ])
+        principal = set([
+            cyclerep(symbols[0] + "".join(p))
+            for p in itertools.permutations(symbols[1:])
+        ]) - one_cycles
+
+        # Each symmetry, as a map of column labels and a permutation of the rows
+        self.maps = []
+        self.permutations = []
+        for image in itertools.permutations(symbols):
+            for reverse in (False, True):
+                table = dict(zip(symbols, image))
+                if set([
+                    cyclerep("".join([ table[c] for c in (w[::-1] if reverse else w) ]))
+                    for w in principal
+                ]) != principal:
+                    continue
+
+                f = relabelling(symbols, image, reverse)
+                permutation = []
+                for row in self.rows:
+                    i = row_sets.get(frozenset(map(f, row)))
+                    if i is None: break
+                    permutation.append(i)
+                else:
+                    self.maps.append(f)
+                    self.permutations.append(permutation)
+
+        self._choose_column()
+
+    def __len__(self):
+        return len(self.permutations)
+
+    def _orbit_representatives(self, column, rows):
+        # The rows covering the column that are first in their orbits
+        # under the symmetries that fix the column
+        stabiliser = [
+            permutation for (f, permutation) in zip(self.maps, self.permutations)
+            if f(column) == column
+        ]
+        return set([ i for i in rows if all([ p[i] >= i for p in stabiliser ]) ])
+
+    def _choose_column(self):
+        # Choose the primary column that leaves fewest rows covering it
+        columns = []
+        covering = {}
+        for (i, row) in enumerate(self.rows):
+            for label in row:
+                if not label.startswith("*"):
+                    if label not in covering:
+                        columns.append(label)
+                        covering[label] = []
+                    covering[label].append(i)
+
+        best = None
+        for column in columns:
+            rows = covering[column]
+            if best is not None and len(rows) - len(best[2]) >= len(best[1]):
+                continue
+            representatives = self._orbit_representatives(column, rows)
+            key = (len(representatives), len(rows) - len(representatives))
+            if best is None or key < (len(best[2]), len(best[1]) - len(best[2])):
+                best = (column, rows, representatives)
+
+        if best is None:
+            # With no primary columns, the only solution is the empty one,
+            # so there is nothing to reduce: use just the identity
+            self.maps = [ lambda label: label ]
+            self.permutations = [ range(len(self.rows)) ]
+            best = (None, [], set())
+        (self.column, covering_rows, self.representatives) = best
+        self.covering = set(covering_rows)
+
+    def reduced_rows(self):
+        """
+        The rows, without those covering the chosen column that can't be
+        in a canonical solution.
+        """
+        return [
+            row for (i, row) in enumerate(self.rows)
+            if i not in self.covering or i in self.representatives
+        ]
+
+    def _key(self, indices):
+        if self.column is None:
+            return (None, sorted(indices))
+        (first,) = [ i for i in indices if i in self.covering ]
+        return (first, sorted(indices))
+
+    def is_canonical(self, solution):
+        """
+        Whether the solution, a list of rows, is the canonical one in its class.
+        """
+        indices = [ self.index[row] for row in solution ]
+        key = self._key(indices)
+        for permutation in self.permutations:
+            if self._key([ permutation[i] for i in indices ]) < key:
+                return False
+        return True
+
+    def orbit(self, solution):
+        """
+        The solutions that the symmetries take the solution to, each once.
+        """
+        indices = [ self.index[row] for row in solution ]
+        images = set()
+        for permutation in self.permutations:
+            image = tuple(sorted([ permutation[i] for i in indices ]))
+            if image not in images:
+                images.add(image)
+                yield [ self.rows[i] for i in image ]
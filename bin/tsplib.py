@@ -0,0 +1,260 @@
+# -*- encoding: utf-8 -*-
+"""
+Read and write the ATSP instances produced by mkatsp.py.
+
+An instance can be stored either as a TSPLIB text file with an explicit
+FULL_MATRIX of weights, which is what LKH and Concorde need, or in a
+compact binary format that can be memory-mapped and read with no parsing.
+
+The binary format consists of a header,
+
+    magic         8 bytes   "ATSPBIN\n"
+    itemsize      uint8     1 or 2: the size in bytes of each weight
+    dimension     uint32
+    max_weight    uint32    the largest finite weight
+    name length   uint16
+    name          bytes
+
+followed by the dimension × dimension weights in row-major order,
+as little-endian unsigned integers of the given size. An infinite
+weight (INF) is stored as the largest value the item size can hold.
+"""
+
+from __future__ import division
+
+import array
+import mmap
+import re
+import struct
+import sys
+
+INF = 99999
+
+MAGIC = b"ATSPBIN\n"
+HEADER = struct.Struct("<8sBIIH")
+
+# Array typecodes for each item size
+TYPECODES = { 1: "B", 2: "H" }
+
+class ATSP(object):
+    """
+    An ATSP instance, read from a file in either TSPLIB text format
+    or the binary format described above.
+
+    Only the header is read when the instance is opened. A text file is
+    then read lazily, one row at a time, each time the weights are needed,
+    so even very large instances can be processed in O(dimension) memory;
+    the first time a single row is asked for, the position of every row
+    in the file is recorded, so that any row can then be read directly.
+    A binary file is memory-mapped, so any row or entry can be read directly.
+    """
+    def __init__(self, filename):
+        self.filename = filename
+        self._max_weight = None
+        self._mmap = None
+        self._row_positions = None
+        with open(filename, 'rb') as f:
+            if f.read(len(MAGIC)) == MAGIC:
+                self._open_binary(f)
+            else:
+                self._open_text()
+
+    def _open_text(self):
+        with open(self.filename, 'r') as f:
+            for line in f:
+                mo = re.match(r"^NAME\s*:\s*(\S.*\S)\s*$", line)
+                if mo:
+                    self.name = mo.group(1)
+                    continue
+
+                mo = re.match(r"^DIMENSION\s*:\s*(\d+)\s*$", line)
+                if mo:
+                    self.dimension = int(mo.group(1))
+                    continue
+
+                if re.match(r"^EDGE_WEIGHT_SECTION", line):
+                    break
+
+    def _open_binary(self, f):
+        f.seek(0)
+        (_, self.itemsize, self.dimension, self._max_weight, name_length) = HEADER.unpack(f.read(HEADER.size))
+        if self.itemsize not in TYPECODES:
+            raise ValueError("%s: unsupported item size %d" % (self.filename, self.itemsize))
+        self.name = f.read(name_length).decode("utf-8")
+        self._offset = HEADER.size + name_length
+        self._sentinel = (1 << (8 * self.itemsize)) - 1
+        self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    @property
+    def is_binary(self):
+        return self._mmap is not None
+
+    def rows(self):
+        """
+        Generate the rows of the weight matrix, in order, as lists of ints.
+        """
+        if self.is_binary:
+            for i in xrange(self.dimension):
+                yield self.row(i)
+            return
+
+        with open(self.filename, 'r') as f:
+            for line in f:
+                if re.match(r"^EDGE_WEIGHT_SECTION", line):
+                    break
+
+            row = []
+            for line in f:
+                if re.match(r"^EOF\s*$", line):
+                    break
+                row += [ int(x) for x in line.split() ]
+                while len(row) >= self.dimension:
+                    yield row[:self.dimension]
+                    row = row[self.dimension:]
+
+    def _find_rows(self):
+        """
+        The position of each row of a text file, as the offset of the line
+        it starts on and the number of weights on that line before it.
+        """
+        positions = []
+        with open(self.filename, 'r') as f:
+            for line in iter(f.readline, ""):
+                if re.match(r"^EDGE_WEIGHT_SECTION", line):
+                    break
+
+            count = 0
+            while True:
+                offset = f.tell()
+                line = f.readline()
+                if not line or re.match(r"^EOF\s*$", line):
+                    break
+                k = len(line.split())
+                while len(positions) * self.dimension < count + k:
+                    positions.append((offset, len(positions) * self.dimension - count))
+                count += k
+        return positions[:self.dimension]
+
+    def row(self, i):
+        """
+        The weights of the edges out of node i (counting from 0).
+        """
+        if not self.is_binary:
+            if self._row_positions is None:
+                self._row_positions = self._find_rows()
+            if not 0 <= i < len(self._row_positions):
+                raise IndexError(i)
+            (offset, skip) = self._row_positions[i]
+            with open(self.filename, 'r') as f:
+                f.seek(offset)
+                row = [ int(x) for x in f.readline().split()[skip:] ]
+                while len(row) < self.dimension:
+                    line = f.readline()
+                    if not line:
+                        raise ValueError("%s: row %d is incomplete" % (self.filename, i))
+                    row += [ int(x) for x in line.split() ]
+            return row[:self.dimension]
+
+        if not 0 <= i < self.dimension:
+            raise IndexError(i)
+        start = self._offset + i * self.dimension * self.itemsize
+        a = array.array(TYPECODES[self.itemsize])
+        a.fromstring(self._mmap[start : start + self.dimension * self.itemsize])
+        if sys.byteorder == "big": a.byteswap()
+        return [ INF if w == self._sentinel else w for w in a ]
+
+    def weight(self, i, j):
+        """
+        The weight of the edge i -> j (counting from 0).
+        """
+        if not self.is_binary:
+            return self.row(i)[j]
+
+        (w,) = struct.unpack_from("<" + TYPECODES[self.itemsize], self._mmap,
+            self._offset + (i * self.dimension + j) * self.itemsize)
+        return INF if w == self._sentinel else w
+
+    @property
+    def max_weight(self):
+        """
+        The largest finite weight in the matrix. For a text file this needs
+        a pass over the weights, which is done at most once.
+        """
+        if self._max_weight is None:
+            self._max_weight = max(
+                max([ w for w in row if w < INF ] or [0])
+                for row in self.rows()
+            )
+        return self._max_weight
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+def write_text(atsp, out):
+    """
+    Write atsp to the file out in TSPLIB text format, as mkatsp.py does.
+    """
+    out.write("NAME : %s\n" % (atsp.name,))
+    out.write("TYPE : ATSP\n")
+    out.write("DIMENSION : %d\n" % (atsp.dimension,))
+    out.write("EDGE_WEIGHT_TYPE : EXPLICIT\n")
+    out.write("EDGE_WEIGHT_FORMAT : FULL_MATRIX\n")
+    out.write("NODE_COORD_TYPE : NO_COORDS\n")
+    out.write("DISPLAY_DATA_TYPE : NO_DISPLAY\n")
+    out.write("EDGE_WEIGHT_SECTION :\n")
+    for row in atsp.rows():
+        out.write(" ".join(map(str, row)))
+        out.write("\n")
+
+def write_binary(atsp, out):
+    """
+    Write atsp to the file out in the binary format, one row at a time.
+    Weights are stored in a single byte each if they are small enough.
+    """
+    max_weight = atsp.max_weight
+    itemsize = 1 if max_weight < 0xFF else 2
+    if max_weight >= 0xFFFF:
+        raise ValueError("Weights are too large for the binary format: %d" % (max_weight,))
+    sentinel = (1 << (8 * itemsize)) - 1
+
+    name = atsp.name.encode("utf-8")
+    out.write(HEADER.pack(MAGIC, itemsize, atsp.dimension, max_weight, len(name)))
+    out.write(name)
+    for row in atsp.rows():
+        a = array.array(TYPECODES[itemsize], [ sentinel if w >= INF else w for w in row ])
+        if sys.byteorder == "big": a.byteswap()
+        out.write(a.tostring())
+
+def read_tour(filename):
+    """
+    Read a tour file written by LKH or Concorde in TSPLIB format,
+    returning the list of node numbers (counting from 1) in order.
+    """
+    tour = []
+    with open(filename, 'r') as f:
+        tour_section = False
+        for line in f:
+            if line.startswith("TOUR_SECTION"):
+                tour_section = True
+            elif tour_section:
+                for x in line.split():
+                    ix = int(x)
+                    if ix == -1: return tour
+                    tour.append(ix)
+    return tour
+
+def write_tour(filename, name, tour):
+    """
+    Write a tour, given as a list of node numbers (counting from 1),
+    to a file in TSPLIB format, e.g. for LKH's INITIAL_TOUR_FILE.
+    """
+    with open(filename, 'w') as f:
+        f.write("NAME : %s\n" % (name,))
+        f.write("TYPE : TOUR\n")
+        f.write("DIMENSION : %d\n" % (len(tour),))
+        f.write("TOUR_SECTION\n")
+        for ix in tour:
+            f.write("%d\n" % (ix,))
+        f.write("-1\nEOF\n")
@@ -0,0 +1,226 @@
+# -*- encoding: utf-8 -*-
+"""
+Build the exact cover problems that xc.py and xc2.py solve, and store them
+in a compact binary file, so they need only be built once for each family
+and n.
+
+The problems are built from plain strings. Each row is a partial 2-cycle:
+a 2-cycle with one of its 1-cycles left out, at which the walk enters the
+next 2-cycle. A row has the 1-cycles it covers, by their least rotations,
+and two secondary columns, which are strings beginning with "*", and it
+knows its entrance.
+
+The binary format consists of a header,
+
+    magic         8 bytes   "XCMATRIX"
+    n             uint8
+    itemsize      uint8     2 or 4: the size in bytes of each column index
+    family length uint8
+    rows          uint32
+    columns       uint32
+    primary       uint32    the number of primary columns
+    entries       uint32    the total number of columns of the rows
+    labels size   uint32
+    family        bytes
+
+followed by the column labels, primary columns first, separated by
+newlines; the entrances of the rows, n bytes each; the offset of each
+row's first entry, and the number of entries, as rows + 1 uint32s; and
+the column index of each entry, as unsigned integers of the given size.
+All the integers are little-endian.
+"""
+
+from __future__ import division
+
+import array
+import itertools
+import os
+import struct
+import sys
+
+SYMBOLS = "123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+MAGIC = b"XCMATRIX"
+HEADER = struct.Struct("<8sBBBIIIII")
+
+# Array typecodes for each item size
+TYPECODES = { 2: "H", 4: "I" }
+
+def cyclerep(w):
+    """
+    The least rotation of the word w, which has no repeated symbols.
+    """
+    i = w.index(min(w))
+    return w[i:] + w[:i]
+
+class Row(object):
+    """
+    A row of the matrix: the labels of the columns it covers, and its entrance.
+    """
+    __slots__ = ("labels", "_entrance")
+
+    def __init__(self, labels, entrance):
+        self.labels = labels
+        self._entrance = entrance
+
+    def entrance(self):
+        return self._entrance
+
+    def __iter__(self):
+        return iter(self.labels)
+
+    def __repr__(self):
+        return "Row(%r, %r)" % (self.labels, self._entrance)
+
+def one_cycles_of_two_cycle(start):
+    """
+    The 1-cycles of the 2-cycle of the word start: the word with its last
+    symbol moved to each position before the end, by least rotation.
+    """
+    (body, h) = (start[:-1], start[-1])
+    return [ cyclerep(body[:i] + h + body[i:]) for i in xrange(len(body)) ]
+
+def one_cycles_of_three_cycle(start):
+    """
+    The 1-cycles of the 3-cycle of the word start: those of each of its
+    2-cycles.
+    """
+    (body, h2, h1) = (start[:-2], start[-2], start[-1])
+    return [
+        one_cycle
+        for i in xrange(len(body))
+        for one_cycle in one_cycles_of_two_cycle(body[:i] + h2 + body[i:] + h1)
+    ]
+
+def principal_single_3cycle(n):
+    return set(one_cycles_of_three_cycle(SYMBOLS[:n]))
+
+def principal_double_3cycle(n):
+    return set(one_cycles_of_three_cycle(SYMBOLS[:n])).union(
+        one_cycles_of_three_cycle(SYMBOLS[1:n-3] + SYMBOLS[0] + SYMBOLS[n-3:n])
+    )
+
+def principal_single_4cycle(n):
+    (a, b) = (SYMBOLS[:n-3], SYMBOLS[n-3:n])
+    principal = set()
+    for i in xrange(len(a)):
+        principal.update(one_cycles_of_three_cycle(a[i:] + a[:i] + b))
+    return principal
+
+# The 1-cycles of the principal cycles of each family
+FAMILIES = {
+    "single_3cycle": principal_single_3cycle,
+    "double_3cycle": principal_double_3cycle,
+    "single_4cycle": principal_single_4cycle,
+}
+
+def build(family, n):
+    """
+    The rows of the exact cover problem for the family, as (rows, secondary):
+    the partial 2-cycles that are disjoint from the principal cycles.
+    """
+    principal = FAMILIES[family](n)
+    rows = []
+    secondary = set()
+    for head_index in xrange(n):
+        h = SYMBOLS[head_index]
+        body_symbols = SYMBOLS[:head_index] + SYMBOLS[head_index + 1 : n]
+        for p in itertools.permutations(body_symbols[1:]):
+            body = body_symbols[0] + "".join(p)
+            one_cycles = one_cycles_of_two_cycle(body + h)
+            for i in xrange(n - 1):
+                # Leave out each 1-cycle in turn
+                one_cycles_set = frozenset(one_cycles[:i] + one_cycles[i+1:])
+                if not one_cycles_set.isdisjoint(principal):
+                    continue
+                entrance = h + body[i:] + body[:i]
+                constraints = ("*" + entrance[2:], "*" + entrance[1:-1])
+                rows.append(Row(tuple(one_cycles_set) + constraints, entrance))
+                secondary.update(constraints)
+    return (rows, secondary)
+
+def write(out, family, n, rows, secondary):
+    """
+    Write the rows to the file out in the binary format.
+    """
+    columns = []
+    column_index = {}
+    offsets = array.array("I", [0])
+    for row in rows:
+        for label in row:
+            if label not in column_index:
+                column_index[label] = None
+                columns.append(label)
+        offsets.append(offsets[-1] + len(row.labels))
+    columns = [ c for c in columns if c not in secondary ] \
+            + [ c for c in columns if c in secondary ]
+    primary = len(columns) - len(secondary.intersection(column_index))
+    for (i, label) in enumerate(columns):
+        column_index[label] = i
+
+    itemsize = 2 if len(columns) <= 0xFFFF else 4
+    entries = array.array(TYPECODES[itemsize], [
+        column_index[label] for row in rows for label in row
+    ])
+    labels = "\n".join(columns)
+
+    out.write(HEADER.pack(MAGIC, n, itemsize, len(family), len(rows),
+        len(columns), primary, len(entries), len(labels)))
+    out.write(family)
+    out.write(labels)
+    out.write("".join([ row.entrance() for row in rows ]))
+    for a in (offsets, entries):
+        if sys.byteorder == "big": a.byteswap()
+        out.write(a.tostring())
+
+def read(f):
+    """
+    Read a file in the binary format, returning (family, n, rows, secondary).
+    """
+    header = f.read(HEADER.size)
+    if len(header) < HEADER.size or not header.startswith(MAGIC):
+        raise ValueError("Not a matrix file: %s" % (getattr(f, "name", f),))
+    (magic, n, itemsize, family_length, row_count, column_count, primary,
+        entry_count, labels_size) = HEADER.unpack(header)
+
+    family = f.read(family_length)
+    columns = f.read(labels_size).split("\n") if column_count else []
+    entrances = f.read(row_count * n)
+    offsets = array.array("I")
+    offsets.fromstring(f.read((row_count + 1) * offsets.itemsize))
+    entries = array.array(TYPECODES[itemsize])
+    entries.fromstring(f.read(entry_count * itemsize))
+    if sys.byteorder == "big":
+        offsets.byteswap()
+        entries.byteswap()
+
+    labels = [ columns[i] for i in entries ]
+    rows = [
+        Row(tuple(labels[offsets[i] : offsets[i+1]]), entrances[i*n : (i+1)*n])
+        for i in xrange(row_count)
+    ]
+    return (family, n, rows, set(columns[primary:]))
+
+def load(family, n, filename=None):
+    """
+    The rows of the exact cover problem for the family, as (rows, secondary).
+    If a filename is given, they are read from that file, which is written
+    first if it does not exist.
+    """
+    if filename is None:
+        return build(family, n)
+    try:
+        f = open(filename, "rb")
+    except IOError:
+        (rows, secondary) = build(family, n)
+        with open(filename + ".tmp", "wb") as out:
+            write(out, family, n, rows, secondary)
+        os.rename(filename + ".tmp", filename)
+        return (rows, secondary)
+
+    with f:
+        (file_family, file_n, rows, secondary) = read(f)
+    if (file_family, file_n) != (family, n):
+        raise ValueError("%s is the %s matrix for n = %d, not %s for n = %d" % (
+            filename, file_family, file_n, family, n))
+    return (rows, secondary)
@@ -0,0 +1,162 @@
+# -*- encoding: utf-8 -*-
+"""
+The command line shared by xc.py and xc2.py, which search for the solutions
+of one family of exact cover problems made by xcmatrix.py, and print the
+superpermutations they represent, walking each with moves of weight up to
+a maximum that depends on the family.
+
+A long search can save its progress to a checkpoint file from time to time,
+and carry on from there if it is interrupted. The checkpoint records how
+much output had been written when it was saved, so any output written
+after that, which will be written again, can be discarded on resuming.
+"""
+
+from __future__ import division
+
+import functools
+import itertools
+import json
+import optparse
+import os
+import stat
+import sys
+
+from dlx import Coverings, parallel_coverings
+from symmetry import Symmetries, normalise
+import xcmatrix
+import xcwalk
+
+SYMBOLS = "123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+def superpermutation_or_none(n, max_weight, solution):
+    """
+    The superpermutation represented by the solution, walking with moves
+    of weight up to max_weight, or None if it is bad.
+    """
+    entrances = [ row.entrance() for row in solution ]
+    return xcwalk.walker(n, max_weight).superpermutation(entrances)
+
+def superpermutations_up_to_symmetry(n, max_weight, symmetries, solution):
+    """
+    If the solution is the canonical one in its class under the symmetries,
+    the superpermutations represented by the solutions in its class, one of
+    each that differs up to relabelling and reversal, and None for each bad
+    solution; otherwise an empty list.
+    """
+    if not symmetries.is_canonical(solution): return []
+    bad = []
+    superpermutations = {}
+    for other in symmetries.orbit(solution):
+        superpermutation = superpermutation_or_none(n, max_weight, other)
+        if superpermutation is None:
+            bad.append(None)
+        else:
+            superpermutations.setdefault(normalise(superpermutation, SYMBOLS), superpermutation)
+    return bad + [ superpermutations[k] for k in sorted(superpermutations) ]
+
+def read_checkpoint(filename):
+    """
+    The checkpoint saved by write_checkpoint, or None if there isn't one.
+    """
+    if not os.path.exists(filename): return None
+    with open(filename) as f:
+        return json.load(f)
+
+def output_size():
+    """
+    The size of the output so far, if it is going to a file, or else None.
+    """
+    st = os.fstat(sys.stdout.fileno())
+    return st.st_size if stat.S_ISREG(st.st_mode) else None
+
+def write_checkpoint(filename, n, symmetry, path, finished=False):
+    """
+    Save the point the search has reached, once the solutions
+    before it have definitely been written out, and how much
+    output there was then.
+    """
+    sys.stdout.flush()
+    size = output_size()
+    if size is not None:
+        os.fsync(sys.stdout.fileno())
+    with open(filename + ".tmp", "w") as f:
+        json.dump({ "n": n, "symmetry": symmetry, "path": path, "finished": finished, "output_size": size }, f)
+    os.rename(filename + ".tmp", filename)
+
+def truncate_output(checkpoint):
+    """
+    Discard any output written after the checkpoint was saved,
+    which will be written again.
+    """
+    if checkpoint["output_size"] is not None and output_size() is not None:
+        os.ftruncate(sys.stdout.fileno(), checkpoint["output_size"])
+
+def main(family, max_weight, report_bad=False):
+    """
+    Search for the solutions of the family of problems named, for the N
+    given on the command line, and print their superpermutations; and if
+    report_bad, say so on stderr for each bad solution.
+    """
+    parser = optparse.OptionParser(usage="%prog [options] N")
+    parser.add_option("-d", "--depth", type="int", default=None,
+        help="split the search into subproblems at this depth, and solve them in parallel")
+    parser.add_option("-p", "--processes", type="int", default=None,
+        help="the number of worker processes to use with --depth (default: one per CPU)")
+    parser.add_option("-c", "--checkpoint", metavar="FILE",
+        help="save the progress of the search to FILE from time to time")
+    parser.add_option("-r", "--resume", action="store_true",
+        help="carry on from the progress saved in the --checkpoint file, if there is one, appending to the output file with >>")
+    parser.add_option("-i", "--interval", type="float", default=60,
+        help="the number of seconds between checkpoints (default %default)")
+    parser.add_option("-m", "--matrix", metavar="FILE",
+        help="read the exact cover matrix from FILE, made by mkxcmatrix.py, or save it there if FILE does not exist")
+    parser.add_option("-s", "--symmetry", action="store_true",
+        help="search only for solutions that are different up to relabelling and reversal")
+    (options, args) = parser.parse_args()
+    if len(args) != 1: parser.error("Wrong number of arguments")
+    if options.checkpoint and options.depth is not None:
+        parser.error("Checkpoints can only be used without --depth")
+    if options.resume and not options.checkpoint:
+        parser.error("--resume needs a --checkpoint file")
+
+    n = int(args[0])
+    try:
+        matrix, secondary = xcmatrix.load(family, n, options.matrix)
+    except ValueError as e:
+        parser.error(str(e))
+    if options.symmetry:
+        symmetries = Symmetries(matrix, SYMBOLS[:n])
+        print >>sys.stderr, "%d symmetries, searching %d of %d rows" % (
+            len(symmetries), len(symmetries.reduced_rows()), len(matrix))
+        matrix = symmetries.reduced_rows()
+        f = functools.partial(superpermutations_up_to_symmetry, n, max_weight, symmetries)
+    else:
+        f = lambda solution: [ superpermutation_or_none(n, max_weight, solution) ]
+    resume = []
+    if options.resume:
+        checkpoint = read_checkpoint(options.checkpoint)
+        if checkpoint is not None:
+            if checkpoint["n"] != n:
+                parser.error("%s is a checkpoint for N = %d" % (options.checkpoint, checkpoint["n"]))
+            if checkpoint.get("symmetry", False) != bool(options.symmetry):
+                parser.error("%s is a checkpoint for a search %s --symmetry" % (
+                    options.checkpoint, "with" if checkpoint.get("symmetry") else "without"))
+            if checkpoint["finished"]: sys.exit(0)
+            resume = checkpoint["path"]
+            truncate_output(checkpoint)
+
+    if options.checkpoint:
+        save = functools.partial(write_checkpoint, options.checkpoint, n, bool(options.symmetry))
+        results = itertools.imap(f, Coverings(matrix, secondary, resume, save, options.interval))
+    elif options.depth is None:
+        results = itertools.imap(f, Coverings(matrix, secondary))
+    else:
+        results = parallel_coverings(matrix, secondary, options.depth, options.processes, f)
+    for superpermutation in itertools.chain.from_iterable(results):
+        if superpermutation is None:
+            if report_bad:
+                print >>sys.stderr, "Ignoring bad solution"
+        else:
+            print superpermutation
+    if options.checkpoint:
+        write_checkpoint(options.checkpoint, n, bool(options.symmetry), [], finished=True)
@@ -0,0 +1,128 @@
+# -*- encoding: utf-8 -*-
+"""
+Turn a solution found by xc.py or xc2.py into a superpermutation quickly,
+by walking over the ranks of the permutations rather than the permutations
+themselves.
+
+The walk starts at 123...n. From a permutation p, a move of weight k goes
+to p[k:] followed by the first k symbols of p in reverse, which adds those
+k symbols to the superpermutation. The walk makes a move of weight 2 from
+each entrance of the solution, and otherwise the lightest move that reaches
+a permutation it has not visited; if there is none, the solution is bad.
+
+For each weight, a table gives the rank of the permutation that each move
+goes to, and the symbols it adds. A walk marks the permutations it has
+visited, and the entrances, with its own number, so the marks need not be
+cleared between walks; and it puts the symbols each move adds into a buffer
+that is allocated once, and joins them only if the walk succeeds.
+"""
+
+from __future__ import division
+
+import itertools
+
+SYMBOLS = "123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+class Walker(object):
+    """
+    Walk the permutations of n symbols with moves of weight up to max_weight.
+    """
+    def __init__(self, n, max_weight):
+        self.n = n
+        self.max_weight = max_weight
+        permutations = [ "".join(p) for p in itertools.permutations(SYMBOLS[:n]) ]
+        self.rank = dict((p, r) for (r, p) in enumerate(permutations))
+        self.start = permutations[0]
+
+        # For each weight k, the rank reached by a move of weight k from
+        # each rank, and the symbols the move adds. These are lists rather
+        # than arrays, since they are quicker to index.
+        self.successors = [None]
+        self.tails = [None]
+        for k in xrange(1, max_weight + 1):
+            tails = [ p[k-1::-1] for p in permutations ]
+            self.successors.append([
+                self.rank[p[k:] + tail] for (p, tail) in zip(permutations, tails)
+            ])
+            self.tails.append(tails)
+
+        self.visited = [0] * len(permutations)
+        self.entrances = [0] * len(permutations)
+        self.walks = 0
+
+        # The symbols added by each move
+        self.buffer = [None] * len(permutations)
+
+    def superpermutation(self, entrances):
+        """
+        The superpermutation made by the walk with these entrances,
+        or None if the walk is bad.
+        """
+        self.walks += 1
+        walk = self.walks
+
+        (visited, is_entrance, rank) = (self.visited, self.entrances, self.rank)
+        (successors, tails, max_weight) = (self.successors, self.tails, self.max_weight)
+        (s1, s2, t1, t2) = (successors[1], successors[2], tails[1], tails[2])
+        for p in entrances:
+            is_entrance[rank[p]] = walk
+
+        total = len(visited)
+        buf = self.buffer
+        buf[0] = self.start
+        i = 1
+
+        r = 0
+        visited[r] = walk
+        count = 1
+
+        # The number of moves since an unvisited permutation was reached:
+        # if there are more moves than permutations, the walk is going round
+        # in circles and will never reach another
+        idle = 0
+        while count < total:
+            if is_entrance[r] == walk:
+                (q, tail) = (s2[r], t2[r])
+            else:
+                q = s1[r]
+                if visited[q] != walk:
+                    tail = t1[r]
+                else:
+                    q = s2[r]
+                    if visited[q] != walk:
+                        tail = t2[r]
+                    else:
+                        for k in xrange(3, max_weight + 1):
+                            q = successors[k][r]
+                            if visited[q] != walk:
+                                tail = tails[k][r]
+                                break
+                        else:
+                            return None
+
+            if i == len(buf):
+                buf.extend([None] * len(buf))
+            buf[i] = tail
+            i += 1
+
+            r = q
+            if visited[r] == walk:
+                idle += 1
+                if idle > total: return None
+            else:
+                visited[r] = walk
+                count += 1
+                idle = 0
+
+        return "".join(buf[:i])
+
+# A Walker for each (n, max_weight), since building one takes a while
+_walkers = {}
+
+def walker(n, max_weight):
+    """
+    The Walker for n symbols and moves of weight up to max_weight.
+    """
+    if (n, max_weight) not in _walkers:
+        _walkers[(n, max_weight)] = Walker(n, max_weight)
+    return _walkers[(n, max_weight)]
@@ -2,15 +2,21 @@
 from __future__ import division
 
 import logging
+import os
 
 import flask
 
+import storage
 import superperm
 
 # The flask.Flask constructor has a mandatory string argument
 # that has no apparent effect.
 app = flask.Flask("I don’t think this string is actually used")
 
+# The datastore on App Engine, or else whatever SUPERPERM_STORAGE says,
+# e.g. "sqlite:superperm.sqlite" or "memory": see storage.open_storage
+superperm.store = storage.open_storage(os.environ.get("SUPERPERM_STORAGE", "ndb"))
+
 # Exceptions are apparently not logged by default, so we need to
 # add an error handler that logs them.
 @app.errorhandler(500)
@@ -32,3 +38,28 @@ def route_lookup():
         return flask.render_template("output.html", **superpermutation)
     except superperm.Exception, e:
         return flask.render_template("input.html", q=q, error=e.message)
+
+@app.route("/ingest", methods=["POST"])
+def route_ingest():
+    """Add many superpermutations at once, one per line, either as the body
+    of the request or as an uploaded file called "file", which may be gzipped.
+    The report gives the line number of each one.
+    """
+    upload = flask.request.files.get("file")
+    data = upload.read() if upload is not None else flask.request.get_data()
+    lines = superperm.submissions(data)
+    report = superperm.ingest([ raw for (line, raw) in lines ])
+    for entry in report:
+        entry["line"] = lines[entry["index"]][0]
+    return flask.jsonify(report=report)
+
+@app.route("/stats")
+def route_stats():
+    return flask.jsonify(cache=superperm.lookup_cache.stats())
+
+if __name__ == "__main__":
+    # Run outside App Engine, e.g. for load testing, checking long
+    # submissions in worker processes so that short ones are not held up
+    workers = os.environ.get("SUPERPERM_WORKERS")
+    superperm.start_workers(int(workers) if workers else None)
+    app.run(threaded=True)
@@ -0,0 +1,47 @@
+# -*- encoding: utf-8 -*-
+"""Add superpermutations to the database in bulk, from files with one
+superpermutation per line, which may be gzipped, and report which are novel.
+"""
+
+import optparse
+import sys
+
+import storage
+import superperm
+
+def main():
+    parser = optparse.OptionParser(usage="%prog [options] FILE...")
+    parser.add_option("-s", "--storage", default="sqlite:superperm.sqlite",
+        help="where to store the superpermutations (default %default): see storage.open_storage")
+    parser.add_option("-p", "--processes", type="int", default=None,
+        help="the number of worker processes to use (default: one per CPU)")
+    options, filenames = parser.parse_args()
+    if not filenames:
+        parser.error("No files given")
+
+    superperm.store = storage.open_storage(options.storage)
+    if options.processes != 1:
+        superperm.start_workers(options.processes)
+
+    raws, origins = [], []
+    for filename in filenames:
+        with (sys.stdin if filename == "-" else open(filename, 'rb')) as f:
+            for (line, raw) in superperm.submissions(f.read()):
+                raws.append(raw)
+                origins.append((filename, line))
+
+    counts = {}
+    for entry in superperm.ingest(raws):
+        (filename, line) = origins[entry["index"]]
+        status = entry["status"]
+        counts[status] = counts.get(status, 0) + 1
+        if status == "invalid":
+            print "%s:%d: %s: %s" % (filename, line, status, entry["error"])
+        else:
+            print "%s:%d: %s: n=%d, length %d, %s" % (filename, line, status, entry["n"], entry["len"], entry["hash"])
+
+    superperm.store.close()
+    print >>sys.stderr, ", ".join([ "%d %s" % (counts[status], status) for status in sorted(counts) ])
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+# -*- encoding: utf-8 -*-
+"""Where the database app keeps its data.
+
+Everything is stored as a value, which is a dict that can be encoded as JSON,
+under a key of some kind: "StoredSuperpermutation" for the superpermutations
+themselves, keyed by the hash of the canonical form, and "CachedLookup" for
+the results of lookups. There are three implementations:
+
+    NdbStorage      the App Engine datastore
+    SQLiteStorage   a local SQLite database, which can be used concurrently
+    MemoryStorage   a dict, for tests
+
+and open_storage() chooses one by name.
+"""
+
+import contextlib
+import json
+import Queue
+import sqlite3
+import threading
+
+try:
+    from google.appengine.ext import ndb
+except ImportError:
+    ndb = None
+
+
+class Storage(object):
+    """The interface that each kind of storage implements.
+    """
+    def get(self, kind, key):
+        """The value stored under the key, or None if there isn't one.
+        """
+        raise NotImplementedError()
+
+    def put(self, kind, key, value):
+        """Store the value under the key, replacing any value already there.
+        """
+        raise NotImplementedError()
+
+    def add(self, kind, key, value):
+        """Store the value under the key unless there is already a value there,
+        returning True if it was stored.
+        """
+        return key in self.add_many(kind, [ (key, value) ])
+
+    def add_many(self, kind, items):
+        """Store each (key, value) pair whose key does not already have a value,
+        returning the list of keys that were stored.
+        """
+        raise NotImplementedError()
+
+    def close(self):
+        pass
+
+
+# The properties of the values of each kind, which the ndb models declare
+PROPERTIES = {
+    "StoredSuperpermutation": ("n", "s", "encoded"),
+    "CachedLookup": ("result", "n", "hash", "encoded"),
+}
+
+
+class MemoryStorage(Storage):
+    """Values are kept in a dict. Like the datastore, this rejects a value
+    with a property that its kind does not have, and fills in the missing
+    properties of a value it returns with None, so that tests find the
+    same problems as the datastore would.
+    """
+    def __init__(self):
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def _check(self, kind, value):
+        unknown = set(value) - set(PROPERTIES[kind])
+        if unknown:
+            raise ValueError("%s has no properties %s" % (kind, ", ".join(sorted(unknown))))
+
+    def get(self, kind, key):
+        value = self.values.get((kind, key))
+        if value is None:
+            return None
+        return dict((name, value.get(name)) for name in PROPERTIES[kind])
+
+    def put(self, kind, key, value):
+        self._check(kind, value)
+        with self.lock:
+            self.values[(kind, key)] = value
+
+    def add_many(self, kind, items):
+        added = []
+        with self.lock:
+            for (key, value) in items:
+                self._check(kind, value)
+                if (kind, key) not in self.values:
+                    self.values[(kind, key)] = value
+                    added.append(key)
+        return added
+
+
+class SQLiteStorage(Storage):
+    """Values are stored as JSON in a single table. Each thread takes a
+    connection from a pool for as long as it needs one, and writes of many
+    values are made in transactions of up to batch_size values each.
+    """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS entities (
+            kind TEXT NOT NULL,
+            key TEXT NOT NULL,
+            value TEXT NOT NULL,
+            t_created TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (kind, key)
+        )
+    """
+
+    def __init__(self, filename, pool_size=4, batch_size=500):
+        self.filename = filename
+        self.batch_size = batch_size
+        self.pool = Queue.Queue()
+        for i in xrange(pool_size):
+            conn = sqlite3.connect(filename, timeout=60, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self.pool.put(conn)
+        with self._connection() as conn:
+            conn.execute(self.SCHEMA)
+            conn.commit()
+
+    @contextlib.contextmanager
+    def _connection(self):
+        conn = self.pool.get()
+        try:
+            yield conn
+        except:
+            conn.rollback()
+            raise
+        finally:
+            self.pool.put(conn)
+
+    def get(self, kind, key):
+        with self._connection() as conn:
+            row = conn.execute("SELECT value FROM entities WHERE kind = ? AND key = ?", (kind, key)).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def put(self, kind, key, value):
+        with self._connection() as conn:
+            conn.execute("INSERT OR REPLACE INTO entities (kind, key, value) VALUES (?, ?, ?)",
+                (kind, key, json.dumps(value)))
+            conn.commit()
+
+    def add_many(self, kind, items):
+        added = []
+        items = list(items)
+        with self._connection() as conn:
+            for i in xrange(0, len(items), self.batch_size):
+                for (key, value) in items[i : i + self.batch_size]:
+                    cursor = conn.execute("INSERT OR IGNORE INTO entities (kind, key, value) VALUES (?, ?, ?)",
+                        (kind, key, json.dumps(value)))
+                    if cursor.rowcount > 0:
+                        added.append(key)
+                conn.commit()
+        return added
+
+    def close(self):
+        while not self.pool.empty():
+            self.pool.get().close()
+
+
+if ndb is not None:
+    class StoredSuperpermutation(ndb.Model):
+        t_created = ndb.DateTimeProperty(auto_now_add=True)
+
+        n = ndb.IntegerProperty(required=True)
+
+        # Older entries have s, and newer ones its encoding: see superperm._encode
+        s = ndb.TextProperty()
+        encoded = ndb.TextProperty()
+
+    class CachedLookup(ndb.Model):
+        """The result of looking up a submission, keyed by the hash
+        of the submission with its whitespace normalised: n and the hash of
+        the superpermutation it turned out to be, or its encoding if it was
+        too long to store. Older entries have the whole result instead.
+        """
+        t_created = ndb.DateTimeProperty(auto_now_add=True)
+
+        result = ndb.JsonProperty(compressed=True)
+
+        n = ndb.IntegerProperty()
+        hash = ndb.StringProperty()
+        encoded = ndb.TextProperty()
+
+
+class NdbStorage(Storage):
+    """Each kind is an ndb model, whose properties are the values.
+    """
+    def __init__(self):
+        if ndb is None:
+            raise Exception("The App Engine ndb library is not available")
+        self.models = dict(
+            (model.__name__, model) for model in (StoredSuperpermutation, CachedLookup)
+        )
+
+    def get(self, kind, key):
+        entity = ndb.Key(kind, key).get()
+        if entity is None:
+            return None
+        value = entity.to_dict()
+        del value["t_created"]
+        return value
+
+    def put(self, kind, key, value):
+        self.models[kind](id=key, **value).put()
+
+    def add_many(self, kind, items):
+        # Not transactional, but a race only makes both writers think they were first
+        items = list(items)
+        existing = ndb.get_multi([ ndb.Key(kind, key) for (key, value) in items ])
+        new = [ (key, value) for ((key, value), entity) in zip(items, existing) if entity is None ]
+        ndb.put_multi([ self.models[kind](id=key, **value) for (key, value) in new ])
+        return [ key for (key, value) in new ]
+
+
+def open_storage(name):
+    """Open the storage with the given name: "ndb", "memory",
+    or "sqlite:" followed by the name of the database file.
+    """
+    if name == "ndb":
+        return NdbStorage()
+    if name == "memory":
+        return MemoryStorage()
+    if name.startswith("sqlite:"):
+        return SQLiteStorage(name[len("sqlite:"):])
+    raise ValueError("Unknown storage: %s" % (name,))
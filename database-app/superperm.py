@@ -1,10 +1,24 @@
+import base64
+import collections
 import hashlib
 import exceptions
+import gzip
+import itertools
 import logging
 import math
+import Queue
 import re
+import string
+import StringIO
+import threading
+import zlib
 
-from google.appengine.ext import ndb
+try:
+    import multiprocessing
+except ImportError:
+    multiprocessing = None
+
+import storage
 
 # The standard alphabet of symbols
 SYMBOL = "123456789abcdefghijklmnopqrstuvwxyz"
@@ -14,13 +28,13 @@ class Exception(exceptions.Exception): pass
 class NotMinimal(Exception): message = "Superpermutation is not minimal"
 class NotComplete(Exception): message = "Superpermutation is incomplete"
 class TooManySymbols(Exception): message = "Too many different symbols (max = %d)" % (len(SYMBOL),)
+class Timeout(Exception): message = "Superpermutation took too long to check"
+class Busy(Exception): message = "Too many superpermutations are being checked: try again later"
 
 
-class StoredSuperpermutation(ndb.Model):
-    t_created = ndb.DateTimeProperty(auto_now_add=True)
-
-    n = ndb.IntegerProperty(required=True)
-    s = ndb.TextProperty(required=True)
+# Where superpermutations and lookup results are kept,
+# which app.py chooses when it starts
+store = storage.MemoryStorage()
 
 
 def _hash(s):
@@ -30,43 +44,272 @@ def _hash(s):
     h.update(s)
     return h.hexdigest()
 
-def _elements_are_distinct(iterable, seen=None):
-    if seen is None:
-        seen = set()
-    for element in iterable:
-        if element in seen: return False
-        seen.add(element)
-    return True
-
-def _permutations(s, n):
-    for i in xrange(len(s) - n + 1):
-        p = s[i : i + n]
-        if _elements_are_distinct(p):
-            yield p
-
-def _check(s, n):
-    elements = set()
-    if not _elements_are_distinct(_permutations(s, n), elements):
-        raise NotMinimal()
-    if len(elements) != math.factorial(n):
-        raise NotComplete()
+def _encode(s, n):
+    """Encode the normalised string s on n symbols compactly, as text.
+
+    Since s starts with the first n symbols in order, it is determined by
+    the distance from each later character back to the previous occurrence
+    of the same symbol. That is n wherever a permutation follows another
+    with an overlap of n-1, so the distances compress very well.
+    A distance of 255 or more is written as a run of 255s followed by
+    the remainder.
+    """
+    last = {}
+    distances = bytearray()
+    for (i, c) in enumerate(s):
+        if i >= n:
+            d = i - last[c]
+            while d >= 255:
+                distances.append(255)
+                d -= 255
+            distances.append(d)
+        last[c] = i
+    return base64.b64encode(zlib.compress(str(distances), 9))
+
+def _decode(encoded, n):
+    """The string encoded by _encode(s, n).
+    """
+    r = list(SYMBOL[:n])
+    d = 0
+    for x in bytearray(zlib.decompress(base64.b64decode(encoded))):
+        d += x
+        if x < 255:
+            r.append(r[-d])
+            d = 0
+    return "".join(r)
+
+def _stored(n, s):
+    """The value to store for the superpermutation s on n symbols.
+    """
+    return dict(n=n, encoded=_encode(s, n))
+
+def get_superpermutation(key):
+    """The stored superpermutation with the given hash, as (n, s), or None.
+    Older entries store s itself rather than its encoding.
+    """
+    value = store.get("StoredSuperpermutation", key)
+    if value is None:
+        return None
+    n = value["n"]
+    return (n, value["s"] if value.get("s") else _decode(value["encoded"], n))
+
+def _rank(p, symbols):
+    """The index of the permutation p of symbols in lexicographic order.
+    """
+    remaining = list(symbols)
+    r = 0
+    for c in p:
+        i = remaining.index(c)
+        r = r * len(remaining) + i
+        del remaining[i]
+    return r
+
+# The identity translation table
+_IDENTITY = [ chr(i) for i in xrange(256) ]
+
+class _Ranker(object):
+    """Rank permutations of the first n symbols quickly, using one table
+    lookup for the first k symbols and another for the rest, translated
+    to the first n-k symbols in the same relative order.
+    """
+    # Use tables with at most about this many entries
+    MAX_TABLE = 10000
+
+    def __init__(self, n):
+        self.symbols = SYMBOL[:n]
+        f = [ math.factorial(i) for i in xrange(n + 1) ]
+        k = 0
+        while k < n and f[n] // f[n - k - 1] <= self.MAX_TABLE:
+            k += 1
+        self.k = k
+        self.prefixes = None
+        if f[n - k] > self.MAX_TABLE:
+            return
+
+        suffixes = {}
+        for p in itertools.permutations(SYMBOL[:n - k]):
+            suffixes["".join(p)] = len(suffixes)
+        self.suffixes = suffixes
+
+        self.prefixes = {}
+        for prefix in itertools.permutations(self.symbols, k):
+            prefix = "".join(prefix)
+            rest = [ c for c in self.symbols if c not in prefix ]
+            table = list(_IDENTITY)
+            for (i, c) in enumerate(rest):
+                table[ord(c)] = self.symbols[i]
+            self.prefixes[prefix] = (_rank(prefix + "".join(rest), self.symbols), "".join(table))
+
+    def __call__(self, p):
+        if self.prefixes is None:
+            return _rank(p, self.symbols)
+        (base, table) = self.prefixes[p[:self.k]]
+        return base + self.suffixes[p[self.k:].translate(table)]
+
+class Validation(object):
+    """The result of checking a normalised string s on n symbols:
+
+    is_minimal  no permutation occurs more than once
+    is_complete every permutation occurs
+    wasted      the positions of the characters that do not complete a permutation
+    parts       the pieces it splits into, which _minimise rearranges
+    """
+    def __init__(self, s, n, flags, is_minimal, count):
+        self.s = s
+        self.n = n
+        self.flags = flags
+        self.is_minimal = is_minimal
+        self.is_complete = (count == math.factorial(n))
+        self.wasted = [ i + n - 1 for (i, flag) in enumerate(flags) if not flag ]
+        self.parts = _split(s, n, flags)
+
+    def check(self):
+        """Raise an exception unless this is a valid superpermutation.
+        """
+        if not self.is_minimal:
+            raise NotMinimal()
+        if not self.is_complete:
+            raise NotComplete()
+        return self
+
+# The rankers made so far, which are kept since they take a while to make
+_rankers = {}
+
+class Validator(object):
+    """Check a normalised string on n symbols in a single pass, which
+    may be fed to it in pieces, by sliding a window of length n along it.
+
+    The window is tracked with a count of each symbol in it and of how many
+    of its symbols are repeated, so each step takes constant time; and the
+    permutations seen are recorded as a bitset of their ranks.
+    """
+    # Use a set of ranks rather than a bitset of n! bits beyond this
+    MAX_BITSET_N = 10
+
+    def __init__(self, n):
+        self.n = n
+        if n not in _rankers:
+            _rankers[n] = _Ranker(n)
+        self.rank = _rankers[n]
+        if n <= self.MAX_BITSET_N:
+            self.seen = bytearray((math.factorial(n) + 7) // 8)
+        else:
+            self.seen = None
+            self.seen_set = set()
+        self.count = 0
+        self.is_minimal = True
+        self.flags = bytearray()
+        self.pieces = []
+        self.length = 0
+        self.window = ""
+        self.counts = [0] * 256
+        self.bad = 0
+
+    def _see(self, p):
+        r = self.rank(p)
+        if self.seen is None:
+            if r in self.seen_set: return False
+            self.seen_set.add(r)
+        else:
+            i, bit = r >> 3, 1 << (r & 7)
+            if self.seen[i] & bit: return False
+            self.seen[i] |= bit
+        return True
+
+    def feed(self, chunk):
+        n, counts, flags = self.n, self.counts, self.flags
+        self.pieces.append(chunk)
+        buf = self.window + chunk
+        base = self.length - len(self.window)
+        bad = self.bad
+        for i in xrange(len(self.window), len(buf)):
+            new = ord(buf[i])
+            if counts[new] > 0: bad += 1
+            counts[new] += 1
+            if base + i >= n:
+                old = ord(buf[i - n])
+                counts[old] -= 1
+                if counts[old] > 0: bad -= 1
+            if base + i >= n - 1:
+                if bad == 0:
+                    flags.append(1)
+                    if self._see(buf[i-n+1 : i+1]):
+                        self.count += 1
+                    else:
+                        self.is_minimal = False
+                else:
+                    flags.append(0)
+        self.bad = bad
+        self.length += len(chunk)
+        self.window = buf[-n:]
+        return self
+
+    def result(self):
+        return Validation("".join(self.pieces), self.n, self.flags, self.is_minimal, self.count)
+
+def validate(s, n):
+    """Check the normalised string s on n symbols in a single pass.
+    """
+    return Validator(n).feed(s).result()
+
+def _permutations(v):
+    """The permutations in the order they occur in the string
+    whose Validation is v.
+    """
+    for (i, flag) in enumerate(v.flags):
+        if flag:
+            yield v.s[i : i + v.n]
+
+# Suffixes of at least this length are found by searching for
+# a prefix of this length, which is much faster than checking each one
+_OVERLAP_KEY = 32
 
 def _overlap(x, y):
-    for i in xrange(min(len(x), len(y)), -1, -1):
-        if x[-i:] == y[:i]:
+    """The length of the longest suffix of x that is a prefix of y.
+    """
+    m = min(len(x), len(y))
+    if m >= _OVERLAP_KEY:
+        key = y[:_OVERLAP_KEY]
+        i = x.find(key, len(x) - m)
+        while i != -1:
+            if y.startswith(x[i:]):
+                return len(x) - i
+            i = x.find(key, i + 1)
+        m = _OVERLAP_KEY - 1
+    for i in xrange(m, 0, -1):
+        if x.endswith(y[:i]):
             return i
     return 0
 
+def _overlaps(xs):
+    """The overlap of each string in xs with the result of squashing
+    together the ones before it.
+
+    Only the end of the string built so far can overlap the next string,
+    so we keep just that much of it to compare.
+    """
+    r = []
+    pieces = []
+    tail = ""
+    for y in xs:
+        if len(tail) < len(y):
+            tail = "".join(pieces)[-len(y):]
+        o = _overlap(tail, y)
+        r.append(o)
+        pieces.append(y[o:])
+        tail = (tail + y[o:])[-len(y):]
+    return r
+
 def _squash(xs):
     """Eliminate overlaps from a list of strings, resulting in a single string.
     """
-    return reduce(lambda x, y: x + y[_overlap(x, y):], xs, "")
+    return "".join([ y[o:] for (y, o) in zip(xs, _overlaps(xs)) ])
 
-def _successor(s, n):
+def _successor(v):
     return _squash([
-        p + SYMBOL[n] + p
-        for p in _permutations(s, n)
-    ]), n+1
+        p + SYMBOL[v.n] + p
+        for p in _permutations(v)
+    ]), v.n+1
 
 def _normalise(s):
     """Translate to the standard alphabet.
@@ -88,14 +331,30 @@ def _normalise(s):
         r.append(translation[c])
     return "".join(r), n
 
-def _split(s, n):
+def _border(s):
+    """The length of the longest proper suffix of s that is also a prefix,
+    computed in linear time with the Knuth-Morris-Pratt failure function.
+    """
+    f = [0] * len(s)
+    k = 0
+    for i in xrange(1, len(s)):
+        while k > 0 and s[i] != s[k]:
+            k = f[k-1]
+        if s[i] == s[k]:
+            k += 1
+        f[i] = k
+    return f[-1] if s else 0
+
+def _split(s, n, flags):
+    """Split s into parts, given the flags for its windows of length n
+    as computed by the Validator.
+    """
     r = [[]]
-    o = _overlap(s[1:], s)
+    o = _border(s)
     k = 0
     for i in xrange(len(s)):
-        if not _elements_are_distinct(s[i-n : i]):
+        if i >= n and not flags[i-n]:
             k += 1
-            print k
             if k >= n - o - 1:
                 r[-1] = r[-1][:o-n+1]
                 r.append(list(s[i-n+1 : i]))
@@ -103,11 +362,10 @@ def _split(s, n):
         else:
             k = 0
         r[-1].append(s[i])
-    
+
     return [ "".join(a) for a in r ]
 
-def _minimise(s, n):
-    parts = _split(s, n)
+def _minimise_slowly(parts):
     minimum = None
     for i in range(len(parts)):
         t = _normalise(_squash(parts[i:] + parts[:i]))[0]
@@ -116,31 +374,335 @@ def _minimise(s, n):
         if minimum is None or t < minimum: minimum = t
     return minimum
 
+def _minimise(s, n, parts):
+    """The least string, once normalised, that can be made by squashing
+    a rotation of the parts, either forwards or reversed.
+
+    Usually the overlap where two parts join does not depend on which part
+    comes first, and then each of these strings is a window on the cyclic
+    string made by squashing the parts round in a circle: the overlap
+    with the part before is the same in the window as in the cycle
+    as long as it is no longer than that part. So we can find
+    the least by comparing prefixes of the windows, of doubling length,
+    and dropping each window as soon as its prefix is not the least,
+    without building each string in full. Otherwise we fall back to
+    building them all.
+    """
+    # Go round three times: once the string built so far is at least as
+    # long as every part, the overlaps are those of the cyclic string.
+    k = len(parts)
+    overlaps = _overlaps(parts * 3)
+    ov = overlaps[2*k:]
+    c = "".join([ part[o:] for (part, o) in zip(parts, ov) ])
+    if overlaps[k : 2*k] != ov or len(c) < max(map(len, parts)) or any([
+        ov[j] >= len(parts[j]) or ov[j] > len(parts[j-1])
+        for j in xrange(k)
+    ]):
+        return _minimise_slowly(parts)
+
+    # Three copies of the cyclic string, forwards and backwards,
+    # so that every window is a slice of them
+    forwards = c * 3
+    backwards = forwards[::-1]
+
+    # Each window is (string, start, end, translation to the standard alphabet)
+    windows = []
+    position = 0
+    for (part, o) in zip(parts, ov):
+        start, end = position - o + len(c), position + 2 * len(c)
+        for (t, i, j) in ((forwards, start, end), (backwards, len(forwards) - end, len(forwards) - start)):
+            initial = t[i : i+n]
+            if len(set(initial)) < n:
+                raise NotMinimal()
+            windows.append((t, i, j, string.maketrans(initial, SYMBOL[:n])))
+        position += len(part) - o
+
+    m = 2 * n
+    while True:
+        prefixes = [ t[i : min(j, i+m)].translate(table) for (t, i, j, table) in windows ]
+        least = min(prefixes)
+        windows = [ w for (w, p) in zip(windows, prefixes) if p == least ]
+        length = max([ j - i for (t, i, j, table) in windows ])
+        if m >= length:
+            return least
+        m = length if len(windows) == 1 else 2 * m
+
 def _parse(s):
+    """Parse and check a submission, returning the Validation
+    of its canonical form.
+    """
     parts = re.split(r"\s+", s.strip())
     s = _squash(parts)
     s, n = _normalise(s)
-    _check(s, n)
-    s = _minimise(s, n)
+    v = validate(s, n).check()
+    s = _minimise(s, n, v.parts)
 
-    return s, n
+    return validate(s, n)
 
 
-def lookup(raw):
-    s, n = _parse(raw)
-    threshold_length = sum([ math.factorial(i) for i in xrange(1, n+1) ])
+class LookupCache(object):
+    """A bounded in-memory cache of lookup results, which discards
+    the least recently used results when they take up more than
+    max_bytes between them, as estimated by _result_size.
+    """
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.results = collections.OrderedDict()
+        self.bytes = 0
+        self.lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key):
+        with self.lock:
+            entry = self.results.pop(key, None)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.results[key] = entry
+            return entry[0]
+
+    def put(self, key, result):
+        size = _result_size(result)
+        with self.lock:
+            old = self.results.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+            self.results[key] = (result, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes and len(self.results) > 1:
+                (result, size) = self.results.popitem(last=False)[1]
+                self.bytes -= size
+                self.evictions += 1
+
+    def stats(self):
+        return dict(size=len(self.results), bytes=self.bytes,
+            hits=self.hits, misses=self.misses, evictions=self.evictions)
+
+def _result_size(result):
+    """Roughly how many bytes the result of a lookup takes up in memory:
+    mostly the superpermutation and its parts, and the list of wasted
+    positions, at a pointer and an int for each.
+    """
+    return 2 * len(result["s"]) + 8 * len(result["parts"]) + 32 * len(result["wasted"])
+
+# The memory to use for lookup results
+CACHE_BYTES = 64 * 1024 * 1024
+
+lookup_cache = LookupCache(CACHE_BYTES)
+
+def _submission_key(raw):
+    """The cache key for a submission: the hash of it with its whitespace normalised.
+    """
+    normalised = " ".join(raw.split())
+    if isinstance(normalised, unicode):
+        normalised = normalised.encode("utf-8")
+    return _hash(normalised)
+
+def _cached_lookup(key):
+    """The cached result of a lookup, from memory or else from the store.
+
+    The store only records which superpermutation the submission turned
+    out to be: its hash, if it was stored, or else its encoding. The rest
+    of the result is worked out again from that, which is still much
+    quicker than parsing the submission. Older entries have the whole result.
+    """
+    result = lookup_cache.get(key)
+    if result is None:
+        cached = store.get("CachedLookup", key)
+        if cached is None:
+            return None
+        if cached.get("result") is not None:
+            result = cached["result"]
+        else:
+            n = cached["n"]
+            if cached.get("encoded") is not None:
+                s = _decode(cached["encoded"], n)
+            else:
+                stored = get_superpermutation(cached["hash"])
+                if stored is None:
+                    return None
+                s = stored[1]
+            result = _lookup_result(s, n)
+        lookup_cache.put(key, result)
+    return result
+
+def _threshold_length(n):
+    """The length of the standard superpermutation on n symbols.
+    """
+    return sum([ math.factorial(i) for i in xrange(1, n+1) ])
 
-    is_long = (len(s) > threshold_length)
+# Submissions longer than this are checked by a worker process, if there are
+# any, so as not to hold up other requests; and the worker is given this long,
+# once it starts, after waiting at most WORKER_WAIT seconds for one to be free
+TIMEOUT_BASE = 5
+TIMEOUT_PER_CHARACTER = 1 / 20000.0
+OFFLOAD_LENGTH = 1000
+WORKER_WAIT = 5
 
-    k = ndb.Key("StoredSuperpermutation", _hash(s))
+class _Workers(object):
+    """Worker processes, each in a pool of its own, so that one that takes
+    too long can be killed and replaced without disturbing the others.
+    A task is only ever given to an idle worker, so it starts at once.
+    """
+    def __init__(self, processes=None):
+        self.idle = Queue.Queue()
+        for i in xrange(processes or multiprocessing.cpu_count()):
+            self.idle.put(multiprocessing.Pool(1))
+
+    def apply(self, f, args, timeout):
+        """f(*args), in a worker, which is killed if it takes longer than timeout.
+        """
+        try:
+            pool = self.idle.get(timeout=WORKER_WAIT)
+        except Queue.Empty:
+            raise Busy()
+        try:
+            return pool.apply_async(f, args).get(timeout)
+        except multiprocessing.TimeoutError:
+            # Replacing the worker forks from a threaded process, but only
+            # as the pool itself does when one of its workers exits
+            pool.terminate()
+            pool = multiprocessing.Pool(1)
+            raise Timeout()
+        finally:
+            self.idle.put(pool)
+
+    def map(self, f, xs):
+        """map(f, xs), shared between the first worker to be free
+        and any others that are free then.
+        """
+        pools = [ self.idle.get() ]
+        try:
+            while True:
+                pools.append(self.idle.get_nowait())
+        except Queue.Empty:
+            pass
+        try:
+            k = len(pools)
+            results = [ pool.map_async(f, xs[i::k], chunksize=8) for (i, pool) in enumerate(pools) ]
+            r = [None] * len(xs)
+            for (i, result) in enumerate(results):
+                r[i::k] = result.get()
+            return r
+        finally:
+            for pool in pools:
+                self.idle.put(pool)
+
+# The worker processes, if start_workers() has been called
+_workers = None
+
+def start_workers(processes=None):
+    """Check long submissions in worker processes from now on, if we
+    can have them (not on App Engine, for example).
+
+    This should be called before any threads are started.
+    """
+    global _workers
+    if _workers is None and multiprocessing is not None:
+        try:
+            _workers = _Workers(processes)
+        except (ImportError, OSError, NotImplementedError):
+            pass
+
+def _lookup_result(s, n, parts=None, wasted=None):
+    """The result of looking up a submission whose canonical form is s,
+    on n symbols, whose parts and wasted positions are found if not given.
+    """
+    if parts is None:
+        v = validate(s, n)
+        (parts, wasted) = (v.parts, v.wasted)
+    threshold_length = _threshold_length(n)
+    return dict(s=s, n=n, len=len(s), is_long=(len(s) > threshold_length),
+        threshold_length=threshold_length, parts=parts, wasted=wasted)
+
+def _parse_for_lookup(raw):
+    v = _parse(raw)
+    return (v.s, v.n, v.parts, v.wasted)
+
+def lookup(raw):
+    # A submission that has been looked up before was stored then, if it
+    # was going to be, so we only need the result of parsing it
+    key = _submission_key(raw)
+    result = _cached_lookup(key)
+    if result is not None:
+        return dict(result, is_novel=False)
+
+    if len(raw) <= OFFLOAD_LENGTH or _workers is None:
+        (s, n, parts, wasted) = _parse_for_lookup(raw)
+    else:
+        timeout = TIMEOUT_BASE + len(raw) * TIMEOUT_PER_CHARACTER
+        (s, n, parts, wasted) = _workers.apply(_parse_for_lookup, (raw,), timeout)
+    result = _lookup_result(s, n, parts, wasted)
 
     is_novel = False
-    if not is_long:
-        ss = k.get()
-        if ss is None:
-            is_novel = True
-            ss = StoredSuperpermutation(key=k, s=s, n=n)
-            ss.put()
-
-    parts = _split(s, n)
-    return dict(s=s, n=n, len=len(s), is_long=is_long, threshold_length=threshold_length, is_novel=is_novel, parts=parts)
+    if result["is_long"]:
+        store.put("CachedLookup", key, dict(n=n, encoded=_encode(s, n)))
+    else:
+        is_novel = store.add("StoredSuperpermutation", _hash(s), _stored(n, s))
+        store.put("CachedLookup", key, dict(n=n, hash=_hash(s)))
+    lookup_cache.put(key, result)
+    return dict(result, is_novel=is_novel)
+
+
+def submissions(data):
+    """The submissions in a bulk upload, one per line, which may be gzipped,
+    as a list of (line number, submission) pairs. Anything after a # on a
+    line is a comment, and lines with nothing else on them are skipped.
+    """
+    if data.startswith("\x1f\x8b"):
+        data = gzip.GzipFile(fileobj=StringIO.StringIO(data)).read()
+    r = []
+    for (i, line) in enumerate(data.splitlines()):
+        line = line.split("#", 1)[0].strip()
+        if line:
+            r.append((i + 1, line))
+    return r
+
+def _canonical(raw):
+    """Parse a submission for ingest(), in a worker process, returning
+    either (n, canonical form) or the message of the exception it raised.
+    """
+    try:
+        v = _parse(raw)
+        return (v.n, v.s)
+    except Exception, e:
+        return e.message
+
+def _map(f, xs):
+    """map(f, xs), in the worker processes started by start_workers(), if
+    there are any; otherwise in this process, since a new pool must not be
+    forked once other threads are running.
+    """
+    if _workers is not None:
+        return _workers.map(f, list(xs))
+    return map(f, xs)
+
+def ingest(raws):
+    """Validate, canonicalise and store a list of submissions, in parallel
+    if start_workers() has been called, returning a report with a dict for
+    each one, in order, whose status is "novel", "known", "long" (not stored
+    because it is too long), "duplicate" (of an earlier one in the list)
+    or "invalid".
+    """
+    report = []
+    items = {}
+    for (i, result) in enumerate(_map(_canonical, raws)):
+        if not isinstance(result, tuple):
+            report.append(dict(index=i, status="invalid", error=result))
+            continue
+        (n, s) = result
+        entry = dict(index=i, n=n, len=len(s), hash=_hash(s))
+        if len(s) > _threshold_length(n):
+            entry["status"] = "long"
+        elif entry["hash"] in items:
+            entry["status"] = "duplicate"
+        else:
+            items[entry["hash"]] = _stored(n, s)
+        report.append(entry)
+
+    added = set(store.add_many("StoredSuperpermutation", items.iteritems()))
+    for entry in report:
+        if "status" not in entry:
+            entry["status"] = "novel" if entry["hash"] in added else "known"
+    return report
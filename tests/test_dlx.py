@@ -0,0 +1,83 @@
+# -*- encoding: utf-8 -*-
+"""
+Tests of the exact cover solver, against a brute-force search.
+"""
+
+import itertools
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "bin"))
+
+import dlx
+
+def random_problem(rnd):
+    """Random rows over a few primary and secondary columns,
+    each of which has at least one primary column.
+    """
+    primary = range(rnd.randint(1, 6))
+    secondary = [ "*%d" % (i,) for i in range(rnd.randint(0, 3)) ]
+    rows = []
+    for i in range(rnd.randint(1, 12)):
+        row = rnd.sample(primary, rnd.randint(1, len(primary)))
+        row += rnd.sample(secondary, rnd.randint(0, len(secondary)))
+        rows.append(tuple(row))
+    return (rows, secondary)
+
+def brute_force(rows, secondary):
+    """The exact covers of the rows, as a set of frozensets of row indices.
+    """
+    columns = set(itertools.chain.from_iterable(rows))
+    primary = columns.difference(secondary)
+    r = set()
+    for k in range(len(rows) + 1):
+        for chosen in itertools.combinations(range(len(rows)), k):
+            labels = [ label for i in chosen for label in rows[i] ]
+            if len(labels) == len(set(labels)) and primary.issubset(labels):
+                r.add(frozenset(chosen))
+    return r
+
+class TestExactCover(unittest.TestCase):
+    def setUp(self):
+        rnd = random.Random(0)
+        self.problems = [ random_problem(rnd) for i in range(200) ]
+
+    def test_brute_force(self):
+        for (rows, secondary) in self.problems:
+            solutions = list(dlx.ExactCover(rows, secondary).solutions())
+            self.assertEqual(len(solutions), len(set(map(frozenset, solutions))))
+            self.assertEqual(set(map(frozenset, solutions)), brute_force(rows, secondary))
+
+    def test_coverings(self):
+        rows = [ (1, 2), (3,), (1,), (2, 3), (2, "*") ]
+        self.assertEqual(
+            sorted(map(sorted, dlx.Coverings(rows, ["*"]))),
+            [ [(1,), (2, 3)], [(1,), (2, "*"), (3,)], [(1, 2), (3,)] ])
+
+    def test_subproblems(self):
+        for (rows, secondary) in self.problems:
+            problem = dlx.ExactCover(rows, secondary)
+            for depth in (1, 2):
+                # One search at a time: the searches share the links
+                prefixes = list(problem.subproblems(depth))
+                solutions = [
+                    solution
+                    for prefix in prefixes
+                    for solution in problem.solutions(prefix)
+                ]
+                self.assertEqual(solutions, list(problem.solutions()))
+
+    def test_resume(self):
+        for (rows, secondary) in self.problems:
+            problem = dlx.ExactCover(rows, secondary)
+            checkpoints = []
+            solutions = []
+            for solution in problem.solutions(checkpoint=lambda path: checkpoints.append((list(path), len(solutions))), interval=0):
+                solutions.append(solution)
+            for (path, count) in checkpoints:
+                self.assertEqual(list(problem.solutions(resume=path)), solutions[count:])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+# -*- encoding: utf-8 -*-
+"""
+Tests of how the database app stores and caches lookups.
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "database-app"))
+
+import storage
+import superperm
+
+class TestCachedLookup(unittest.TestCase):
+    def setUp(self):
+        superperm.store = storage.MemoryStorage()
+        self.forget()
+
+    def forget(self):
+        # Lose the in-memory cache, as a new instance of the app would
+        superperm.lookup_cache = superperm.LookupCache(superperm.CACHE_BYTES)
+
+    def test_stored(self):
+        first = superperm.lookup("123121321")
+        self.assertTrue(first["is_novel"])
+        self.forget()
+        self.assertEqual(superperm.lookup("123 121 321"), dict(first, is_novel=False))
+
+    def test_long(self):
+        first = superperm.lookup("1234123142312431214321413241342134")
+        self.assertTrue(first["is_long"])
+        self.forget()
+        self.assertEqual(superperm.lookup("1234123142312431214321413241342134"), first)
+
+    def test_old_entries(self):
+        result = dict(superperm.lookup("123121321"), is_novel=None)
+        del result["is_novel"]
+        key = superperm._submission_key("321323123")
+        superperm.store.put("CachedLookup", key, dict(result=result))
+        self.assertEqual(superperm.lookup("321323123"), dict(result, is_novel=False))
+
+class TestSchema(unittest.TestCase):
+    def test_unknown_property(self):
+        store = storage.MemoryStorage()
+        self.assertRaises(ValueError, store.put, "CachedLookup", "key", dict(s="123121321"))
+
+    def test_missing_properties(self):
+        store = storage.MemoryStorage()
+        store.put("CachedLookup", "key", dict(n=3, hash="abc"))
+        self.assertEqual(store.get("CachedLookup", "key"), dict(result=None, n=3, hash="abc", encoded=None))
+
+    @unittest.skipIf(storage.ndb is None, "the App Engine ndb library is not available")
+    def test_ndb_models(self):
+        for (kind, properties) in storage.PROPERTIES.items():
+            model = getattr(storage, kind)
+            self.assertEqual(set(model._properties) - set(["t_created"]), set(properties))
+
+if __name__ == "__main__":
+    unittest.main()
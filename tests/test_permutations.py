@@ -0,0 +1,98 @@
+# -*- encoding: utf-8 -*-
+"""
+Tests of ranking permutations and finding them in strings.
+"""
+
+import itertools
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "bin"))
+
+import overlap
+import permrank
+import permscan
+
+class TestRank(unittest.TestCase):
+    def test_lexicographic(self):
+        for n in range(1, 7):
+            for (r, p) in enumerate(itertools.permutations(permrank.SYMBOLS[:n])):
+                p = "".join(p)
+                self.assertEqual(permrank.rank(p), r)
+                self.assertEqual(permrank.unrank(r, n), p)
+
+    def test_symbols(self):
+        for (r, p) in enumerate(itertools.permutations("bdac")):
+            self.assertEqual(permrank.rank("".join(p), "bdac"), r)
+            self.assertEqual(permrank.unrank(r, 4, "bdac"), "".join(p))
+
+    def test_ranker(self):
+        rnd = random.Random(0)
+        for n in range(1, 10):
+            ranker = permrank.Ranker(n)
+            for i in range(200):
+                p = list(permrank.SYMBOLS[:n])
+                rnd.shuffle(p)
+                p = "".join(p)
+                self.assertEqual(ranker(p), permrank.rank(p))
+
+    def test_permutation_set(self):
+        ps = permrank.PermutationSet(4)
+        self.assertTrue(ps.add(5))
+        self.assertFalse(ps.add(5))
+        self.assertTrue(ps.add(23))
+        self.assertEqual((len(ps), 5 in ps, 6 in ps), (2, True, False))
+        self.assertEqual(list(ps), [5, 23])
+        for r in range(24): ps.add(r)
+        self.assertTrue(ps.is_complete())
+
+class TestSquash(unittest.TestCase):
+    def slow_squash(self, xs):
+        s = ""
+        for y in xs:
+            s += y[overlap.overlap(s, y):]
+        return s
+
+    def test_overlap(self):
+        self.assertEqual(overlap.overlap("12312", "3121"), 3)
+        self.assertEqual(overlap.overlap("12312", "1232"), 2)
+        self.assertEqual(overlap.overlap("123", "321"), 1)
+        self.assertEqual(overlap.overlap("123", "456"), 0)
+        self.assertEqual(overlap.overlap("123", "123"), 3)
+        self.assertEqual(overlap.overlap("", "1"), 0)
+
+    def test_random(self):
+        rnd = random.Random(0)
+        for i in range(200):
+            xs = [ "".join(rnd.choice("123") for j in range(rnd.randint(0, 8)))
+                   for k in range(rnd.randint(0, 20)) ]
+            self.assertEqual(overlap.squash(xs), self.slow_squash(xs))
+
+class TestScan(unittest.TestCase):
+    def slow_scan(self, s, n, symbols=permrank.SYMBOLS):
+        return [
+            (i, permrank.rank(s[i:i+n], symbols))
+            for i in range(len(s) - n + 1)
+            if sorted(s[i:i+n]) == sorted(symbols[:n])
+        ]
+
+    def test_random(self):
+        rnd = random.Random(0)
+        for i in range(200):
+            n = rnd.randint(1, 6)
+            s = "".join(rnd.choice(permrank.SYMBOLS[:n+1]) for j in range(rnd.randint(0, 60)))
+            self.assertEqual(list(permscan.scan(s, n)), self.slow_scan(s, n))
+
+    def test_symbols(self):
+        s = "abcabacba"
+        self.assertEqual(list(permscan.scan(s, 3, "abc")), self.slow_scan(s, 3, "abc"))
+        self.assertEqual(list(permscan.scan(s, 3)), [])
+
+    def test_infer_n(self):
+        self.assertEqual(permscan.infer_n("123121321"), 3)
+        self.assertEqual(permscan.infer_n("1234"), 4)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+# -*- encoding: utf-8 -*-
+"""
+Tests of how the database app encodes and canonicalises superpermutations.
+"""
+
+import itertools
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "database-app"))
+
+import superperm
+
+def greedy_superpermutation(n, rnd):
+    """A superpermutation on n symbols, made by repeatedly adding one of the
+    unseen permutations that overlaps the end of it the most, chosen at random.
+    It may contain some permutations more than once.
+    """
+    perms = [ "".join(p) for p in itertools.permutations(superperm.SYMBOL[:n]) ]
+    s = perms[0]
+    seen = set([s])
+    while len(seen) < len(perms):
+        for k in range(n - 1, -1, -1):
+            candidates = [ q for q in perms if q not in seen and s.endswith(q[:k]) ]
+            if candidates: break
+        s += rnd.choice(candidates)[k:]
+        seen.update([ w for w in (s[i:i+n] for i in range(len(s) - n + 1)) if len(set(w)) == n ])
+    return s
+
+class TestEncode(unittest.TestCase):
+    def assertRoundTrip(self, s, n):
+        self.assertEqual(superperm._decode(superperm._encode(s, n), n), s)
+
+    def test_superpermutations(self):
+        rnd = random.Random(0)
+        for n in range(1, 6):
+            for i in range(5):
+                self.assertRoundTrip(greedy_superpermutation(n, rnd), n)
+
+    def test_long_distances(self):
+        # Distances of 255 or more are written as runs of 255s
+        for gap in (253, 254, 255, 256, 509, 510, 511):
+            self.assertRoundTrip("123" + "12" * (gap // 2) + "1" * (gap % 2) + "3", 3)
+
+class TestMinimise(unittest.TestCase):
+    def assertMinimises(self, s, n):
+        v = superperm.validate(s, n)
+        if not (v.is_minimal and v.is_complete): return
+        self.assertEqual(superperm._minimise(s, n, v.parts), superperm._minimise_slowly(v.parts))
+
+    def test_known(self):
+        for s in (
+            "123121321",
+            "123412314231243121342132413214321",
+            "1234123142312431214321413241342134",
+            "123451234152341253412354123145231425314235142315421352413521435213452135421534215432154231245321453241532451325413251432513425132453124351243152431254312",
+            "123451234152341253412354132541352413542134521342513421534213541231452314253142351423154231245321435214325143215432145324153245132453124351243152431254312",
+        ):
+            self.assertMinimises(s, superperm._normalise(s)[1])
+
+    def test_successors(self):
+        (s, n) = ("1", 1)
+        for i in range(5):
+            (s, n) = superperm._successor(superperm.validate(s, n))
+            self.assertMinimises(s, n)
+
+    def test_greedy(self):
+        rnd = random.Random(1)
+        for i in range(100):
+            n = rnd.choice([3, 4, 5])
+            self.assertMinimises(greedy_superpermutation(n, rnd), n)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+# -*- encoding: utf-8 -*-
+"""
+Tests of reading and writing ATSP instances in text and binary format.
+"""
+
+import os
+import random
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "bin"))
+
+import tsplib
+
+class TestATSP(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, name, rows, per_line=None):
+        """Write the rows as a TSPLIB text file, with per_line weights on each
+        line, or a row on each line if per_line is None, and return its filename.
+        """
+        filename = os.path.join(self.directory, name)
+        weights = [ w for row in rows for w in row ]
+        per_line = per_line or len(rows)
+        with open(filename, "w") as f:
+            f.write("NAME : %s\nTYPE : ATSP\nDIMENSION : %d\n" % (name, len(rows)))
+            f.write("EDGE_WEIGHT_TYPE : EXPLICIT\nEDGE_WEIGHT_FORMAT : FULL_MATRIX\n")
+            f.write("EDGE_WEIGHT_SECTION :\n")
+            for i in range(0, len(weights), per_line):
+                f.write(" ".join(map(str, weights[i : i+per_line])) + "\n")
+            f.write("EOF\n")
+        return filename
+
+    def convert(self, atsp, write, name):
+        filename = os.path.join(self.directory, name)
+        with open(filename, "wb") as out:
+            write(atsp, out)
+        return tsplib.ATSP(filename)
+
+    def random_rows(self, dimension, max_weight):
+        rnd = random.Random(dimension)
+        return [
+            [ rnd.choice([ rnd.randint(0, max_weight), tsplib.INF ]) for j in range(dimension) ]
+            for i in range(dimension)
+        ]
+
+    def assertRows(self, atsp, rows):
+        self.assertEqual(atsp.dimension, len(rows))
+        self.assertEqual(list(atsp.rows()), rows)
+        for i in reversed(range(len(rows))):
+            self.assertEqual(atsp.row(i), rows[i])
+            self.assertEqual(atsp.weight(i, len(rows) - 1 - i), rows[i][len(rows) - 1 - i])
+        self.assertRaises(IndexError, atsp.row, len(rows))
+
+    def test_round_trip(self):
+        for (dimension, max_weight, itemsize) in ((7, 10, 1), (9, 254, 1), (9, 255, 2), (6, 1000, 2)):
+            rows = self.random_rows(dimension, max_weight)
+            rows[0][0] = max_weight
+            text = tsplib.ATSP(self.write("random", rows))
+            self.assertFalse(text.is_binary)
+            self.assertRows(text, rows)
+
+            binary = self.convert(text, tsplib.write_binary, "random.bin")
+            self.assertTrue(binary.is_binary)
+            self.assertEqual((binary.name, binary.itemsize, binary.max_weight), ("random", itemsize, max_weight))
+            self.assertRows(binary, rows)
+
+            again = self.convert(binary, tsplib.write_text, "random.atsp")
+            self.assertFalse(again.is_binary)
+            self.assertEqual((again.name, again.max_weight), ("random", max_weight))
+            self.assertRows(again, rows)
+            binary.close()
+
+    def test_wrapped_rows(self):
+        # A row may start part of the way along a line, and span several
+        rows = self.random_rows(5, 20)
+        for per_line in (1, 3, 7, 25):
+            self.assertRows(tsplib.ATSP(self.write("wrapped", rows, per_line)), rows)
+
+    def test_too_large(self):
+        text = tsplib.ATSP(self.write("large", [ [0, 0xFFFF], [1, 0] ]))
+        self.assertRaises(ValueError, self.convert, text, tsplib.write_binary, "large.bin")
+
+    def test_tour(self):
+        filename = os.path.join(self.directory, "tour")
+        tsplib.write_tour(filename, "tour", [3, 1, 2])
+        self.assertEqual(tsplib.read_tour(filename), [3, 1, 2])
+
+if __name__ == "__main__":
+    unittest.main()